@@ -1,16 +1,37 @@
-from flask import Flask, request, jsonify, send_file, render_template, redirect, url_for, session, flash, g
+from flask import Flask, request, jsonify, send_file, render_template, redirect, url_for, session, flash, make_response
+from flask.json.provider import DefaultJSONProvider
+from flask.logging import default_handler
+import copy
 import io
+import logging
+import logging.handlers
+import mimetypes
 import os
-import glob
-import json
+import queue
+import random
+import uuid
+import orjson
 import sqlite3
+import hashlib
+import atexit
+import threading
+import time
+from collections import namedtuple
+from bisect import bisect_left
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timezone, timedelta
 from docx import Document
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from multiprocessing import Process
-from multi_scraper.spiders.data import MarketResearchSpider, generate_docx_from_data
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt
+from multi_scraper.spiders.data import generate_docx_from_data
+from scrape_worker import ScrapeWorker
+from passwords import PASSWORD_HASH_METHOD, PASSWORD_HASHER, hash_password, verify_password, password_needs_rehash
 from multi_scraper.toc import export_to_word, add_bullet_point_text, transform_market_data, generate_segmental_analysis, title_h1
+from multi_scraper.excel_gen import generate_excel, clean_filename
 from openai import OpenAI
 from dotenv import load_dotenv
 import re
@@ -18,11 +39,73 @@ import tempfile
 import secrets
 import pandas as pd
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for request parsing, jsonify and |tojson.
+
+    jsonify goes through response(), which serializes straight to bytes with
+    orjson (indented in debug mode, like Flask's). sort_keys, defaulting to the
+    provider's sort_keys as in Flask, maps onto orjson's OPT_SORT_KEYS; dumps()
+    calls with any other stdlib json option fall back to the default provider.
+    """
+
+    def _orjson_default(self, o):
+        # orjson rejects tuple subclasses such as namedtuple rows
+        if isinstance(o, tuple):
+            return list(o)
+        return self.default(o)
+
+    def _orjson_option(self, sort_keys):
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {'sort_keys'}:
+            return super().dumps(obj, **kwargs)
+        option = self._orjson_option(kwargs.get('sort_keys', self.sort_keys))
+        return orjson.dumps(obj, default=self._orjson_default, option=option).decode()
+
+    def response(self, *args, **kwargs):
+        # Same pretty/compact choice as DefaultJSONProvider.response, whose dumps()
+        # call always passes indent= or separators= and would miss the orjson path
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._orjson_option(self.sort_keys)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self._orjson_default, option=option) + b'\n',
+            mimetype=self.mimetype,
+        )
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
 app = Flask(__name__, template_folder='templates', static_folder='templates', static_url_path='/templates')
+app.json = OrjsonProvider(app)
+
+# Log records are handed to a queue and written by a listener thread, so a
+# slow stderr (or a burst of errors) never blocks request threads
+_log_queue = queue.SimpleQueue()
+app.logger.removeHandler(default_handler)
+app.logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, default_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 # Load environment variables first
 load_dotenv()
 
+# image_gen depends on the optional google-genai package; without it only
+# /api/generate-image is unavailable
+try:
+    from image_gen import generate_market_image
+except ImportError as e:
+    generate_market_image = None
+    IMAGE_GEN_IMPORT_ERROR = str(e)
+
 # Use strong random secret key if not set in environment
 app.secret_key = os.getenv('FLASK_SECRET') or secrets.token_hex(32)
 if not os.getenv('FLASK_SECRET'):
@@ -31,6 +114,16 @@ if not os.getenv('FLASK_SECRET'):
 # IST Timezone (UTC+5:30)
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# Precompiled patterns for the Jinja timestamp filter and the LLM helpers
+TS_PREFIX_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2})")
+NUM_PREFIX_RE = re.compile(r"^\d+(?:\.\d+)*\.\s*")
+# Outline number of a segment line; 'dot' is set when the number ends in '.'
+# (followed by optional spaces) and can be stripped
+SEGMENT_NUMBER_RE = re.compile(r"^(?P<num>\d+(?:\.\d+)*)(?P<dot>\.\s*)?")
+LIST_PREFIX_RE = re.compile(r'^[\d]+[\.\)\-\s]+')
+# Characters not allowed in saved JSON file names (str.translate table that drops them)
+UNSAFE_FILENAME_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+
 def now_ist():
     """Return current time in IST"""
     return datetime.now(IST).replace(tzinfo=None).isoformat()
@@ -64,26 +157,272 @@ def flatten_ai_segments(segments_data):
     """
     result = []
     
-    def traverse(segments, level=0):
-        for segment in segments:
-            if isinstance(segment, dict):
-                result.append((segment.get('name', ''), level))
-                if segment.get('subsegments'):
-                    traverse(segment['subsegments'], level + 1)
-    
     if isinstance(segments_data, dict) and 'segments' in segments_data:
-        traverse(segments_data['segments'])
+        roots = segments_data['segments']
     elif isinstance(segments_data, list):
-        traverse(segments_data)
+        roots = segments_data
+    else:
+        return result
+    
+    # Depth-first pre-order walk with an explicit stack (children pushed in reverse)
+    stack = [(segment, 0) for segment in reversed(roots)]
+    while stack:
+        segment, level = stack.pop()
+        if isinstance(segment, dict):
+            result.append((segment.get('name', ''), level))
+            subsegments = segment.get('subsegments')
+            if subsegments:
+                stack.extend((sub, level + 1) for sub in reversed(subsegments))
     
     return result
 
+def json_list_count(value):
+    """Length of a list or JSON-encoded list (as stored in rd_submissions); 0 otherwise"""
+    if isinstance(value, str):
+        try:
+            value = orjson.loads(value) if value else []
+        except Exception:
+            return 0
+    return len(value) if isinstance(value, list) else 0
+
+def iter_json_files(*dirs):
+    """(path, st_ctime) of every visible *.json file directly inside dirs.
+
+    One scandir pass per directory; DirEntry caches the stat result, so each
+    candidate costs a single stat call. Missing directories are skipped.
+    """
+    for d in dirs:
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.name.startswith('.') or not entry.name.endswith('.json') or not entry.is_file():
+                        continue
+                    yield entry.path, entry.stat().st_ctime
+        except FileNotFoundError:
+            continue
+
+@lru_cache(maxsize=512)
+def _scan_folder(folder, mtime_ns):
+    """One scandir of folder; mtime_ns is only part of the cache key."""
+    found = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not entry.name.startswith('.') and entry.is_file():
+                found.setdefault(os.path.splitext(entry.name)[1].lower(), []).append(entry.path)
+    return found
+
+def files_by_extension(folder):
+    """Visible files directly inside folder grouped by lower-case extension ('.docx': [paths]).
+
+    Cached per directory mtime, so adding or removing a file invalidates the
+    entry and an unchanged folder costs a single stat. Treat the result as
+    read-only.
+    """
+    try:
+        return _scan_folder(folder, os.stat(folder).st_mtime_ns)
+    except FileNotFoundError:
+        return {}
+
+def latest_json_file(*dirs):
+    """Path of the most recently created *.json file across dirs, or None."""
+    return max(iter_json_files(*dirs), key=lambda item: item[1], default=(None, None))[0]
+
+def record_autosave(db, scope, market_name, path):
+    """Index a just-written saved/autosave file in latest_autosave (caller commits)."""
+    db.execute(SQL_RECORD_AUTOSAVE, (scope, path, market_name, time.time()))
+
+def latest_autosave_path(scope):
+    """Most recently written file of an autosave scope.
+
+    One indexed lookup; the directory scan only runs while latest_autosave has
+    no entry for the scope (files that predate the index).
+    """
+    row = get_db().execute(SQL_LATEST_AUTOSAVE, (scope,)).fetchone()
+    if row:
+        return row['path']
+    return latest_json_file(*AUTOSAVE_SCOPE_DIRS[scope])
+
+def autosave_segment_sources():
+    """Candidate files holding saved segments, most preferred first.
+
+    Lazy, so the full-save lookup only runs when the autosave candidate
+    turned out to have no segments.
+    """
+    # Most recent short RD autosave (saved by market name), else the older
+    # single-file autosave location
+    yield (latest_autosave_path('short_rd')
+           or os.path.join(SAVED_DATA_DIR, 'latest_segments.json'))
+    # Most recent full saved JSON file (full_rd_data or legacy top-level files)
+    yield latest_autosave_path('full_rd')
+
+def load_autosaved_segments(paths=None):
+    """First non-empty 'segments' list among paths (default autosave_segment_sources()), or None."""
+    for path in autosave_segment_sources() if paths is None else paths:
+        if not path:
+            continue
+        try:
+            with open(path, 'rb') as f:
+                saved = orjson.loads(f.read())
+        except FileNotFoundError:
+            continue
+        except Exception:
+            app.logger.exception(f'Failed to read saved segments file: {path}')
+            continue
+        saved_segments = saved.get('segments') if isinstance(saved, dict) else None
+        if isinstance(saved_segments, list) and len(saved_segments) > 0:
+            return saved_segments
+    return None
+
+def write_file_atomic(path, data):
+    """Write bytes to path through a sibling temp file and os.replace.
+
+    Readers see either the previous or the new complete file, never a
+    partial write.
+    """
+    tmp_path = f'{path}.tmp.{os.getpid()}.{threading.get_ident()}'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def backup_file(path):
+    """Keep path's current contents as path + '.bak', replacing any older backup.
+
+    The backup is a hard link swapped in with os.replace, so path itself never
+    goes missing; returns the backup path, or None if path doesn't exist.
+    """
+    bak_path = path + '.bak'
+    tmp_path = f'{bak_path}.tmp.{os.getpid()}.{threading.get_ident()}'
+    try:
+        os.link(path, tmp_path)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # No hard links on this filesystem: move the file aside as before
+        os.replace(path, bak_path)
+        return bak_path
+    os.replace(tmp_path, bak_path)
+    return bak_path
+
+# Characters that can change JsonObjectScanner's brace/string state
+JSON_SCAN_RE = re.compile(r'[{}"\\]')
+
+class JsonObjectScanner:
+    """Incremental brace-depth scanner for LLM output.
+
+    Text is fed in chunks (whole responses or streamed deltas); feed() returns True
+    once the first balanced {...} object has closed. Braces inside JSON string
+    literals are ignored.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.start = -1
+        self.end = -1
+        self._offset = 0
+        self._depth = 0
+        self._in_string = False
+        # Absolute position just past the last backslash escape inside a string
+        self._skip_until = 0
+
+    def feed(self, chunk):
+        self.parts.append(chunk)
+        if self.end >= 0:
+            return True
+        offset = self._offset
+        self._offset += len(chunk)
+        pos = 0
+        if self.start < 0:
+            pos = chunk.find('{')
+            if pos < 0:
+                return False
+            self.start = offset + pos
+            self._depth = 1
+            pos += 1
+        # Let the regex engine skip over ordinary characters; only braces,
+        # quotes and backslashes can change the scanner state
+        depth, in_string, skip = self._depth, self._in_string, self._skip_until - offset
+        for m in JSON_SCAN_RE.finditer(chunk, pos):
+            i = m.start()
+            if i < skip:
+                continue
+            c = m.group()
+            if in_string:
+                if c == '"':
+                    in_string = False
+                elif c == '\\':
+                    skip = i + 2
+            elif c == '"':
+                in_string = True
+            elif c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+                if depth == 0:
+                    self.end = offset + i + 1
+                    break
+        self._depth, self._in_string, self._skip_until = depth, in_string, offset + skip
+        return self.end >= 0
+
+    @property
+    def text(self):
+        return ''.join(self.parts)
+
+    def json_text(self):
+        """The first complete {...} span, or None if no object has closed"""
+        if self.end < 0:
+            return None
+        return self.text[self.start:self.end]
+
+def extract_json_object(text):
+    """Return the first balanced {...} span in an LLM response, or None."""
+    scanner = JsonObjectScanner()
+    scanner.feed(text)
+    return scanner.json_text()
+
+def stream_chat_completion(model, messages, stop_when=None):
+    """Run a streamed chat completion and return the accumulated text.
+
+    stop_when(delta) is called for every content delta; returning True stops
+    reading the stream early (e.g. once the JSON object or list is complete).
+    """
+    response = openai_client.chat.completions.create(model=model, messages=messages, stream=True)
+    parts = []
+    try:
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ''
+            if not delta:
+                continue
+            parts.append(delta)
+            if stop_when and stop_when(delta):
+                break
+    finally:
+        response.close()
+    return ''.join(parts)
+
+# Display format for fmt_ts (e.g., 2025-11-26 08:31 AM)
+TS_DISPLAY_FMT = '%Y-%m-%d %I:%M %p'
+
 # Jinja filter: format ISO timestamp to "dd mon yyyy HH:MM" (e.g., 26 nov 2025 08:31)
 @app.template_filter('fmt_ts')
 def fmt_ts(value):
     try:
         if not value:
             return '—'
+        # Fast path: canonical isoformat() strings as written by now_ist()
+        if isinstance(value, str) and len(value) >= 19 and value[4] == '-' and value[10] in ('T', ' '):
+            try:
+                return datetime.fromisoformat(value).strftime(TS_DISPLAY_FMT)
+            except ValueError:
+                pass
         s = str(value).strip()
         # Normalize common variants
         s = s.rstrip('Z')
@@ -92,35 +431,127 @@ def fmt_ts(value):
             dt = datetime.fromisoformat(s)
         except Exception:
             # Fallback: match "YYYY-MM-DD[ T]HH:MM"
-            m = re.match(r"^(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2})", s)
+            m = TS_PREFIX_RE.match(s)
             if not m:
                 return s
             y, mo, d, hh, mm = m.groups()
             dt = datetime(int(y), int(mo), int(d), int(hh), int(mm))
-        out = dt.strftime('%Y-%m-%d %I:%M %p')
-        return out
+        return dt.strftime(TS_DISPLAY_FMT)
     except Exception:
         return '—'
 
-DB_PATH = os.path.join(os.path.dirname(__file__), 'auth_users.db')
+# Install-relative paths, resolved once at import
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# AUTH_DB_PATH in .env points the app at another database file (e.g. for tests)
+DB_PATH = os.getenv('AUTH_DB_PATH') or os.path.join(APP_DIR, 'auth_users.db')
+# Autosaves and saved RD JSON files
+SAVED_DATA_DIR = os.path.join(APP_DIR, 'saved_data')
+FULL_RD_DIR = os.path.join(SAVED_DATA_DIR, 'full_rd_data')
+SHORT_RD_DIR = os.path.join(SAVED_DATA_DIR, 'short_rd_data')
+DOMINATING_REGION_DIR = os.path.join(APP_DIR, 'dominating_region')
+TOC_TEMPLATE_PATH = os.path.join(APP_DIR, 'multi_scraper', 'toc.docx')
+os.makedirs(FULL_RD_DIR, exist_ok=True)
+os.makedirs(SHORT_RD_DIR, exist_ok=True)
+# latest_autosave scopes and the folders their files live in; 'full_rd' also
+# covers the legacy files saved directly under saved_data/
+AUTOSAVE_SCOPE_DIRS = {
+    'short_rd': (SHORT_RD_DIR,),
+    'full_rd': (FULL_RD_DIR, SAVED_DATA_DIR),
+}
+
+# UPDATE/DELETE ... RETURNING needs SQLite 3.35+
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Per-connection tuning: NORMAL sync is safe under WAL, temp tables stay in RAM,
+# ~64MB page cache and 256MB memory-mapped reads for the dashboard queries
+SQLITE_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA mmap_size=268435456',
+)
+
+# Hot-path SQL kept as shared constants so every call site sends identical text
+# and hits the connection's prepared-statement cache
+SQL_INSERT_USER = 'INSERT INTO users (username, password_hash, role, created_by, created_at) VALUES (?,?,?,?,?)'
+SQL_GET_USER = 'SELECT * FROM users WHERE username = ?'
+SQL_UPDATE_LAST_LOGIN = 'UPDATE users SET last_login = ? WHERE username = ?'
+SQL_UPDATE_PASSWORD = 'UPDATE users SET password_hash = ? WHERE username = ?'
+SQL_RECORD_AUTOSAVE = """
+    INSERT INTO latest_autosave (scope, path, market_name, mtime) VALUES (?, ?, ?, ?)
+    ON CONFLICT(scope, path) DO UPDATE SET market_name = excluded.market_name, mtime = excluded.mtime
+"""
+SQL_LATEST_AUTOSAVE = 'SELECT path FROM latest_autosave WHERE scope = ? ORDER BY mtime DESC LIMIT 1'
+SQL_LIST_USERS = 'SELECT username, role, created_by, created_at, last_login FROM users ORDER BY role, username'
+
+# Connection pool: one long-lived connection per worker thread (keyed on PID so forked
+# children never reuse the parent's handle), all tracked so they can be closed at exit
+_db_local = threading.local()
+_db_connections = []
+_db_connections_lock = threading.Lock()
+
+def _connect_db():
+    db = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    db.row_factory = sqlite3.Row
+    for pragma in SQLITE_PRAGMAS:
+        db.execute(pragma)
+    return db
 
 def get_db():
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(DB_PATH)
-        db.row_factory = sqlite3.Row
+    db = getattr(_db_local, 'conn', None)
+    if db is None or _db_local.pid != os.getpid():
+        db = _db_local.conn = _connect_db()
+        _db_local.pid = os.getpid()
+        with _db_connections_lock:
+            _db_connections.append(db)
     return db
 
+@atexit.register
+def close_all_connections():
+    with _db_connections_lock:
+        for db in _db_connections:
+            try:
+                # Refresh planner statistics for the indexes these connections used
+                db.execute('PRAGMA optimize')
+                db.close()
+            except Exception:
+                pass
+        _db_connections.clear()
+
+@contextmanager
+def transaction(db):
+    """Run the enclosed statements as one BEGIN IMMEDIATE ... COMMIT (rolled back on error)"""
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        yield db
+    except BaseException:
+        db.rollback()
+        raise
+    db.commit()
+
+# Bumped whenever init_db() or the startup bootstrap gains a one-time migration
+# (stored in PRAGMA user_version). 3: formerly the admin scrypt hash migration,
+# which now runs on every startup.
+# 4: unique market_name for the save-data upsert. 5: latest_autosave file index.
+# 6: non-NULL submitted_at for the admin submissions keyset pagination.
+SCHEMA_VERSION = 6
+
 def init_db():
+    """Create tables/indexes and run pending migrations; the caller owns the transaction.
+
+    Returns the schema version the database had before this call.
+    """
     db = get_db()
-    
-    # Drop old tables if they exist (migration - one time only)
-    try:
-        db.execute('DROP TABLE IF EXISTS submissions')
-        db.execute('DROP TABLE IF EXISTS chat_messages')
-        # Note: rd_submissions is NOT dropped - data persists
-    except Exception:
-        pass
+    schema_version = db.execute('PRAGMA user_version').fetchone()[0]
+
+    if schema_version < 1:
+        # Drop old tables if they exist (migration - one time only)
+        try:
+            db.execute('DROP TABLE IF EXISTS submissions')
+            db.execute('DROP TABLE IF EXISTS chat_messages')
+            # Note: rd_submissions is NOT dropped - data persists
+        except Exception:
+            pass
     
     # Users table - only admin and researcher roles
     db.execute('''
@@ -175,96 +606,185 @@ def init_db():
         active_seconds INTEGER DEFAULT NULL,
 
         -- Additional KMI (Key Market Insights) beyond the fixed ones
-        additional_kmi TEXT DEFAULT NULL
+        additional_kmi TEXT DEFAULT NULL,
+
+        -- Denormalized list lengths of segments / companies (kept in sync on every write)
+        segment_count INTEGER DEFAULT 0,
+        company_count INTEGER DEFAULT 0
     )
     ''')
 
-    # Migration: add active_seconds to existing DBs that predate this column
-    try:
-        db.execute('ALTER TABLE rd_submissions ADD COLUMN active_seconds INTEGER DEFAULT NULL')
-    except Exception:
-        pass
+    # Indexes backing the dashboards' ORDER BY submitted_at DESC (global and per researcher)
+    # and the role lookups in list_users / the admin bootstrap check
+    db.execute('CREATE INDEX IF NOT EXISTS idx_rd_submitted ON rd_submissions(submitted_at DESC)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_rd_user_submitted ON rd_submissions(researcher_username, submitted_at DESC)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)')
 
-    # Migration: add additional_kmi column
-    try:
-        db.execute('ALTER TABLE rd_submissions ADD COLUMN additional_kmi TEXT DEFAULT NULL')
-    except Exception:
-        pass
-    
-    # Clean up old creator users (migration)
-    try:
-        db.execute("DELETE FROM users WHERE role = 'creator'")
-    except Exception:
-        pass
-    
-    db.commit()
+    # Index of the saved/autosave JSON files, so the "latest file" fallbacks are a
+    # point query instead of a directory scan
+    db.execute('''
+    CREATE TABLE IF NOT EXISTS latest_autosave (
+        scope TEXT NOT NULL,
+        path TEXT NOT NULL,
+        market_name TEXT,
+        mtime REAL NOT NULL,
+        PRIMARY KEY (scope, path)
+    )
+    ''')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_autosave_latest ON latest_autosave(scope, mtime DESC)')
+
+    if schema_version < 1:
+        # Migration: add active_seconds to existing DBs that predate this column
+        try:
+            db.execute('ALTER TABLE rd_submissions ADD COLUMN active_seconds INTEGER DEFAULT NULL')
+        except Exception:
+            pass
 
-from werkzeug.security import generate_password_hash, check_password_hash
+        # Migration: add additional_kmi column
+        try:
+            db.execute('ALTER TABLE rd_submissions ADD COLUMN additional_kmi TEXT DEFAULT NULL')
+        except Exception:
+            pass
+
+        # Clean up old creator users (migration)
+        try:
+            db.execute("DELETE FROM users WHERE role = 'creator'")
+        except Exception:
+            pass
 
-def create_user(username, password, role, created_by=None):
+    if schema_version < 2:
+        # Migration: denormalized segment/company counts, backfilled from the JSON columns
+        for col in ('segment_count', 'company_count'):
+            try:
+                db.execute(f'ALTER TABLE rd_submissions ADD COLUMN {col} INTEGER DEFAULT 0')
+            except Exception:
+                pass
+        # JSON1 counts inside SQLite; malformed or NULL blobs count as 0
+        db.execute('''
+            UPDATE rd_submissions SET
+                segment_count = CASE WHEN json_valid(segments) THEN json_array_length(segments) ELSE 0 END,
+                company_count = CASE WHEN json_valid(companies) THEN json_array_length(companies) ELSE 0 END
+        ''')
+
+    if schema_version < 4:
+        # Migration: save-data upserts by market_name, so keep only the newest row per
+        # market. The old UPDATE ... WHERE market_name kept the submission content of
+        # duplicates identical, but file_path and the download tracking were set per
+        # row, so merge those into the surviving row before deleting the others.
+        duplicates = db.execute('''
+            SELECT market_name, COUNT(*) FROM rd_submissions
+            GROUP BY market_name HAVING COUNT(*) > 1
+        ''').fetchall()
+        if duplicates:
+            app.logger.warning('Merging duplicate rd_submissions rows: %s',
+                               ', '.join(f'{name!r} x{count}' for name, count in duplicates))
+        db.execute('''
+            UPDATE rd_submissions AS s SET
+                file_path = COALESCE(s.file_path, (
+                    SELECT d.file_path FROM rd_submissions d
+                    WHERE d.market_name = s.market_name AND d.file_path IS NOT NULL
+                    ORDER BY d.id DESC LIMIT 1)),
+                downloaded = (
+                    SELECT MAX(COALESCE(d.downloaded, 0) != 0) FROM rd_submissions d
+                    WHERE d.market_name = s.market_name),
+                last_downloaded_at = (
+                    SELECT MAX(d.last_downloaded_at) FROM rd_submissions d
+                    WHERE d.market_name = s.market_name)
+            WHERE s.id IN (
+                SELECT MAX(id) FROM rd_submissions GROUP BY market_name HAVING COUNT(*) > 1)
+        ''')
+        db.execute('''
+            DELETE FROM rd_submissions
+            WHERE id NOT IN (SELECT MAX(id) FROM rd_submissions GROUP BY market_name)
+        ''')
+        db.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_rd_market_name ON rd_submissions(market_name)')
+
+    if schema_version < 5:
+        # Migration: index the files already on disk (market name = file stem)
+        db.executemany(SQL_RECORD_AUTOSAVE, (
+            (scope, path, os.path.splitext(os.path.basename(path))[0], ctime)
+            for scope, dirs in AUTOSAVE_SCOPE_DIRS.items()
+            for path, ctime in iter_json_files(*dirs)
+        ))
+
+    if schema_version < 6:
+        # Migration: the (submitted_at, id) keyset comparison is never true for a
+        # NULL submitted_at, which hid such rows after the first page. '' keeps
+        # them sorted last, as NULL was; every write path sets submitted_at.
+        db.execute("UPDATE rd_submissions SET submitted_at = '' WHERE submitted_at IS NULL")
+
+    if schema_version < SCHEMA_VERSION:
+        db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return schema_version
+
+def create_user(username, password, role, created_by=None, commit=True):
     db = get_db()
-    # Use pbkdf2:sha256 to avoid environments without hashlib.scrypt
-    password_hash = generate_password_hash(password, method='pbkdf2:sha256', salt_length=16)
+    password_hash = hash_password(password)
     now = now_ist()
     try:
-        db.execute('INSERT INTO users (username, password_hash, role, created_by, created_at) VALUES (?,?,?,?,?)',
-                   (username, password_hash, role, created_by, now))
-        db.commit()
+        db.execute(SQL_INSERT_USER, (username, password_hash, role, created_by, now))
+        if commit:
+            db.commit()
         return True
     except sqlite3.IntegrityError:
         return False
 
 def get_user_by_username(username):
     db = get_db()
-    cur = db.execute('SELECT * FROM users WHERE username = ?', (username,))
+    cur = db.execute(SQL_GET_USER, (username,))
     return cur.fetchone()
 
 def update_last_login(username):
     db = get_db()
     now = now_ist()
-    db.execute('UPDATE users SET last_login = ? WHERE username = ?', (now, username))
+    db.execute(SQL_UPDATE_LAST_LOGIN, (now, username))
     db.commit()
 
 def list_users():
     db = get_db()
-    cur = db.execute('SELECT username, role, created_by, created_at, last_login FROM users ORDER BY role, username')
+    cur = db.execute(SQL_LIST_USERS)
     return cur.fetchall()
 
-@app.before_request
-def before_request():
-    init_db()
-
 @app.teardown_appcontext
 def close_connection(exception):
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
-
-# Create default admin if none exists
+    # Pooled connections stay open; just make sure an uncommitted transaction
+    # from a failed request doesn't leak into the next one on this thread
+    db = getattr(_db_local, 'conn', None)
+    if db is not None and db.in_transaction:
+        db.rollback()
+
+# Create schema (and run one-time migrations) plus default admin once at startup,
+# all inside a single transaction so bootstrap costs one commit
 with app.app_context():
-    init_db()
     db = get_db()
-    cur = db.execute('SELECT COUNT(*) as cnt FROM users WHERE role = ?', ('admin',))
-    r = cur.fetchone()
     # Use strong default password from env, or generate a random one
     admin_pass = os.getenv('DEFAULT_ADMIN_PASSWORD')
     if not admin_pass:
         admin_pass = secrets.token_urlsafe(16)
         app.logger.warning(f'DEFAULT_ADMIN_PASSWORD not set! Generated random password: {admin_pass}')
         app.logger.warning('Set DEFAULT_ADMIN_PASSWORD in .env for production.')
-    if not r or r['cnt'] == 0:
-        # Create default admin using pbkdf2
-        create_user('admin', admin_pass, 'admin', created_by='system')
-        app.logger.info('Default admin created with username `admin`. Change the password immediately.')
-    else:
-        # If existing admin uses scrypt, migrate to pbkdf2 using DEFAULT_ADMIN_PASSWORD
-        cur = db.execute('SELECT username, password_hash FROM users WHERE role = ? LIMIT 1', ('admin',))
-        admin_row = cur.fetchone()
-        if admin_row and isinstance(admin_row['password_hash'], str) and admin_row['password_hash'].startswith('scrypt:'):
-            new_hash = generate_password_hash(admin_pass, method='pbkdf2:sha256', salt_length=16)
-            db.execute('UPDATE users SET password_hash = ? WHERE username = ?', (new_hash, admin_row['username']))
-            db.commit()
-            app.logger.warning('Admin password hash migrated from scrypt to pbkdf2. Use DEFAULT_ADMIN_PASSWORD to log in.')
+    # journal_mode=WAL is persisted in the database file, so setting it once here,
+    # before any request thread connects, covers every connection. It can't be
+    # changed inside a transaction, hence outside init_db().
+    db.execute('PRAGMA journal_mode=WAL')
+    with transaction(db):
+        init_db()
+        admin_exists = db.execute('SELECT 1 FROM users WHERE role = ? LIMIT 1', ('admin',)).fetchone()
+        if admin_exists is None:
+            # Create default admin
+            create_user('admin', admin_pass, 'admin', created_by='system', commit=False)
+            app.logger.info('Default admin created with username `admin`. Change the password immediately.')
+        elif not hasattr(hashlib, 'scrypt'):
+            # This host can't verify a scrypt admin hash (e.g. the database was written on
+            # a host with OpenSSL scrypt), so reset it from DEFAULT_ADMIN_PASSWORD. Checked
+            # on every startup because it depends on the host, not on the database version.
+            cur = db.execute('SELECT username, password_hash FROM users WHERE role = ? LIMIT 1', ('admin',))
+            admin_row = cur.fetchone()
+            if admin_row and isinstance(admin_row['password_hash'], str) and admin_row['password_hash'].startswith('scrypt:'):
+                new_hash = hash_password(admin_pass)
+                db.execute(SQL_UPDATE_PASSWORD, (new_hash, admin_row['username']))
+                new_method = 'argon2id' if PASSWORD_HASHER is not None else PASSWORD_HASH_METHOD
+                app.logger.warning(f'Admin password hash migrated from scrypt to {new_method}. Use DEFAULT_ADMIN_PASSWORD to log in.')
 
 def login_required(role=None):
     """Require login, optionally restricting by role or roles.
@@ -299,16 +819,12 @@ def login_required(role=None):
         return wrapper
     return decorator
 
-def generate_ai_segments(title):
-    """Generate segments and subsegments using OpenAI GPT-5-mini based on the title"""
-    try:
-        if not os.getenv("OPENAI_API_KEY"):
-            return {'error': 'OpenAI API key not configured'}
-        
-        prompt = f"""
+# LLM prompt templates: static text with {{PLACEHOLDER}} markers filled in by
+# str.replace, so each call builds its prompt in one pass
+SEGMENTS_PROMPT_TMPL = """
             You are a market research expert who creates concise and logical market segmentation hierarchies.
 
-            Based on the following title: "{title}"
+            Based on the following title: "{{TITLE}}"
 
             Generate a clear and relevant **market segmentation structure** suitable for a professional market research report.
 
@@ -324,62 +840,147 @@ def generate_ai_segments(title):
             - and at every level dont give only one point give atlest 2 points or more.
 
             ### Format (Strict JSON):
-            {{
+            {
             "segments": [
-                {{
+                {
                 "name": "Level 1 Segment Name",
                 "subsegments": [
-                    {{
+                    {
                     "name": "Level 2 Sub-segment Name",
                     "subsegments": [
-                        {{
+                        {
                         "name": "Level 3 Sub-sub-segment Name",
                         "subsegments": [
-                            {{
+                            {
                             "name": "Level 4 Sub-sub-sub-segment Name",
                             "subsegments": [] ← Must be an empty list at the deepest level
-                            }}
+                            }
                         ]
-                        }}
+                        }
                     ]
-                    }}
+                    }
                 ]
-                }}
+                }
             ]
-            }}
+            }
 
             ### Output Rules:
             - Respond **only with valid JSON** (no explanations, text, or notes).
-            - Structure depth and number of segments should **match the complexity** of "{title}".
+            - Structure depth and number of segments should **match the complexity** of "{{TITLE}}".
             - Be relevant, realistic, and concise.
             """
 
+ANALYZE_SEGMENTS_PROMPT_TMPL = """
+            You are a market research expert. Multiple reports were scraped and produced the following segmentation entries for the topic:
+            Title: "{{TITLE}}"
+
+            Scraped segmentation entries (unnormalized, mixed levels):
+            {{SEGMENTS}}
+
+            Task: Merge, normalize, and organize these entries into a clean hierarchical market segmentation suitable for a professional report.
+
+            Rules:
+            - Create 2–5 Level 1 segments that cover the space comprehensively.
+            - Add 1–4 subsegments per parent as needed; go deeper only when meaningful (up to Level 4).
+            - Deduplicate synonyms and overlapping items; prefer common industry naming.
+            - Keep names concise (max 3–4 words), business-oriented, and readable.
+            - Do NOT include regions/geography unless they appear explicitly and are relevant.
+            - Avoid empty parents; if a segment has no children, set its subsegments to [].
+
+            Output JSON (strict):
+            {
+              "segments": [
+                { "name": "Level 1 Segment", "subsegments": [
+                  { "name": "Level 2 Subsegment", "subsegments": [
+                    { "name": "Level 3 Subsegment", "subsegments": [
+                      { "name": "Level 4 Subsegment", "subsegments": [] }
+                    ] }
+                  ] }
+                ] }
+              ]
+            }
+
+            Respond ONLY with valid JSON.
+        """
+
+SCRAPED_COMPANIES_PROMPT_TMPL = """
+Scraped company names from market research (prioritize these if valid):
+{{COMPANIES}}
+
+IMPORTANT: Validate the scraped companies first:
+- REJECT if bankrupt, defunct, or no longer operating
+- REJECT if acquired or merged into another company
+- REJECT if it's only a subsidiary (keep parent companies)
+- ACCEPT if currently active and independently operating
+- Include ACCEPTED scraped companies in the top positions
+
+"""
+
+COMPANIES_PROMPT_TMPL = """
+You are a market research expert specializing in company validation and database creation.
+
+Task: Create a ranked list of exactly 20 unique, relevant, and currently active company names for the {{MARKET}} market.
+
+{{SCRAPED}}
+
+Requirements:
+1. Output ONLY company names (no descriptions, explanations, or labels)
+2. Each company must be:
+   - Currently active (operating as of 2026)
+   - NOT bankrupt or defunct
+   - NOT merged or acquired by another company
+3. All 20 companies must be unique (no duplicates or subsidiaries of the same parent)
+4. Companies should be relevant to: {{MARKET}}
+5. If scraped companies were provided, validate and include them in top positions
+6. Fill remaining slots with relevant companies from industry knowledge
+
+Output format (exactly 20 companies, one per line, names only):
+1. Company Name A
+2. Company Name B
+3. Company Name C
+... (continue to exactly 20)
+
+DO NOT:
+- Add descriptions or explanations
+- Include company status labels (e.g., "leading", "top")
+- Exceed or fall below 20 companies
+- Include duplicate companies or subsidiaries of the same parent
+- Add anything after the company names
+"""
+
+def generate_ai_segments(title):
+    """Generate segments and subsegments using OpenAI GPT-5-mini based on the title"""
+    try:
+        if not os.getenv("OPENAI_API_KEY"):
+            return {'error': 'OpenAI API key not configured'}
+        
+        prompt = SEGMENTS_PROMPT_TMPL.replace('{{TITLE}}', title)
+
         # Updated API call (model configurable via env)
         model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        response = openai_client.chat.completions.create(
-            model=model_name,
-            messages=[
+        scanner = JsonObjectScanner()
+        content = stream_chat_completion(
+            model_name,
+            [
                 {"role": "system", "content": "You are a market research expert who creates detailed market segmentation structures. Always respond with valid JSON only."},
                 {"role": "user", "content": prompt}
-            ]
-        )
-        
-        # Extract JSON safely
-        content = response.choices[0].message.content.strip()
+            ],
+            stop_when=scanner.feed
+        ).strip()
         print(f"DEBUG: AI Raw Response: {content}")
         
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            parsed_result = json.loads(json_str)
-            print(f"DEBUG: Parsed AI Result: {json.dumps(parsed_result, indent=2)}")
+        # Extract JSON safely (the scanner already located it while streaming)
+        json_str = scanner.json_text()
+        if json_str:
+            parsed_result = orjson.loads(json_str)
+            print(f"DEBUG: Parsed AI Result: {orjson.dumps(parsed_result, option=orjson.OPT_INDENT_2).decode()}")
             return parsed_result
         else:
-            parsed_result = json.loads(content)
-            print(f"DEBUG: Parsed AI Result (direct): {json.dumps(parsed_result, indent=2)}")
+            parsed_result = orjson.loads(content)
+            print(f"DEBUG: Parsed AI Result (direct): {orjson.dumps(parsed_result, option=orjson.OPT_INDENT_2).decode()}")
             return parsed_result
             
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         return {'error': f'Failed to parse AI response: {str(e)}'}
     except Exception as e:
         return {'error': f'AI generation failed: {str(e)}'}
@@ -400,7 +1001,7 @@ def analyze_ai_segments(title, scraped_segments):
             if not isinstance(seg, str):
                 continue
             # Strip numbering like "1.", "1.2.", etc.
-            cleaned = re.sub(r"^\d+(?:\.\d+)*\.\s*", "", seg).strip()
+            cleaned = NUM_PREFIX_RE.sub("", seg).strip()
             if cleaned and cleaned not in seen:
                 seen.add(cleaned)
                 cleaned_segments.append(cleaned)
@@ -408,58 +1009,28 @@ def analyze_ai_segments(title, scraped_segments):
         # Build the prompt using scraped segments as context
         segments_text = "\n".join(f"- {s}" for s in cleaned_segments[:300])  # safety cap
 
-        prompt = f"""
-            You are a market research expert. Multiple reports were scraped and produced the following segmentation entries for the topic:
-            Title: "{title or 'N/A'}"
-
-            Scraped segmentation entries (unnormalized, mixed levels):
-            {segments_text}
-
-            Task: Merge, normalize, and organize these entries into a clean hierarchical market segmentation suitable for a professional report.
-
-            Rules:
-            - Create 2–5 Level 1 segments that cover the space comprehensively.
-            - Add 1–4 subsegments per parent as needed; go deeper only when meaningful (up to Level 4).
-            - Deduplicate synonyms and overlapping items; prefer common industry naming.
-            - Keep names concise (max 3–4 words), business-oriented, and readable.
-            - Do NOT include regions/geography unless they appear explicitly and are relevant.
-            - Avoid empty parents; if a segment has no children, set its subsegments to [].
-
-            Output JSON (strict):
-            {{
-              "segments": [
-                {{ "name": "Level 1 Segment", "subsegments": [
-                  {{ "name": "Level 2 Subsegment", "subsegments": [
-                    {{ "name": "Level 3 Subsegment", "subsegments": [
-                      {{ "name": "Level 4 Subsegment", "subsegments": [] }}
-                    ] }}
-                  ] }}
-                ] }}
-              ]
-            }}
-
-            Respond ONLY with valid JSON.
-        """
+        prompt = (ANALYZE_SEGMENTS_PROMPT_TMPL
+                  .replace('{{SEGMENTS}}', segments_text)
+                  .replace('{{TITLE}}', title or 'N/A'))
 
         model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        response = openai_client.chat.completions.create(
-            model=model_name,
-            messages=[
+        scanner = JsonObjectScanner()
+        content = stream_chat_completion(
+            model_name,
+            [
                 {"role": "system", "content": "You are a market research expert who creates detailed, normalized segmentation hierarchies. Always respond with valid JSON only."},
                 {"role": "user", "content": prompt}
-            ]
-        )
-
-        content = response.choices[0].message.content.strip()
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            parsed_result = json.loads(json_str)
+            ],
+            stop_when=scanner.feed
+        ).strip()
+        json_str = scanner.json_text()
+        if json_str:
+            parsed_result = orjson.loads(json_str)
             return parsed_result
         else:
-            return json.loads(content)
+            return orjson.loads(content)
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         return {'error': f'Failed to parse AI response: {str(e)}'}
     except Exception as e:
         return {'error': f'AI analysis failed: {str(e)}'}
@@ -496,72 +1067,47 @@ def validate_and_generate_companies(market_name, scraped_companies=None):
         # Build validation and generation prompt
         scraped_text = ""
         if valid_scraped:
-            scraped_text = f"""
-Scraped company names from market research (prioritize these if valid):
-{chr(10).join(f"- {c}" for c in valid_scraped[:100])}
-
-IMPORTANT: Validate the scraped companies first:
-- REJECT if bankrupt, defunct, or no longer operating
-- REJECT if acquired or merged into another company
-- REJECT if it's only a subsidiary (keep parent companies)
-- ACCEPT if currently active and independently operating
-- Include ACCEPTED scraped companies in the top positions
-
-"""
-        
-        prompt = f"""
-You are a market research expert specializing in company validation and database creation.
-
-Task: Create a ranked list of exactly 20 unique, relevant, and currently active company names for the {market_name} market.
-
-{scraped_text}
-
-Requirements:
-1. Output ONLY company names (no descriptions, explanations, or labels)
-2. Each company must be:
-   - Currently active (operating as of 2026)
-   - NOT bankrupt or defunct
-   - NOT merged or acquired by another company
-3. All 20 companies must be unique (no duplicates or subsidiaries of the same parent)
-4. Companies should be relevant to: {market_name}
-5. If scraped companies were provided, validate and include them in top positions
-6. Fill remaining slots with relevant companies from industry knowledge
-
-Output format (exactly 20 companies, one per line, names only):
-1. Company Name A
-2. Company Name B
-3. Company Name C
-... (continue to exactly 20)
-
-DO NOT:
-- Add descriptions or explanations
-- Include company status labels (e.g., "leading", "top")
-- Exceed or fall below 20 companies
-- Include duplicate companies or subsidiaries of the same parent
-- Add anything after the company names
-"""
+            scraped_text = SCRAPED_COMPANIES_PROMPT_TMPL.replace(
+                '{{COMPANIES}}', '\n'.join(f"- {c}" for c in valid_scraped[:100]))
+        
+        prompt = (COMPANIES_PROMPT_TMPL
+                  .replace('{{SCRAPED}}', scraped_text)
+                  .replace('{{MARKET}}', market_name))
+
+        # Stop streaming once 20 distinct company lines have fully arrived
+        streamed_names = set()
+        pending_line = ['']
+        def have_twenty_companies(delta):
+            *complete, pending_line[0] = (pending_line[0] + delta).split('\n')
+            for line in complete:
+                key = LIST_PREFIX_RE.sub('', line.strip()).strip().lower()
+                if key:
+                    streamed_names.add(key)
+            return len(streamed_names) >= 20
 
         model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        response = openai_client.chat.completions.create(
-            model=model_name,
-            messages=[
+        content = stream_chat_completion(
+            model_name,
+            [
                 {"role": "system", "content": "You are a market research expert. Return ONLY a numbered list of exactly 20 company names, one per line. No other text."},
                 {"role": "user", "content": prompt}
-            ]
-        )
-        
-        content = response.choices[0].message.content.strip()
+            ],
+            stop_when=have_twenty_companies
+        ).strip()
         
         # Parse the numbered list
         companies = []
+        seen_lower = set()
         lines = content.split('\n')
         for line in lines:
             line = line.strip()
             if not line:
                 continue
             # Remove numbering (e.g., "1.", "1)", "1 -")
-            clean = re.sub(r'^[\d]+[\.\)\-\s]+', '', line).strip()
-            if clean and clean.lower() not in [c.lower() for c in companies]:
+            clean = LIST_PREFIX_RE.sub('', line).strip()
+            key = clean.lower()
+            if key and key not in seen_lower:
+                seen_lower.add(key)
                 companies.append(clean)
         
         # Ensure exactly 20 companies
@@ -579,14 +1125,11 @@ DO NOT:
         print(f"Error in validate_and_generate_companies: {e}")
         return {'error': f'Company generation failed: {str(e)}'}
 
-def run_spider(urls, output_dir):
-    """Run Scrapy crawler in a separate process"""
-    settings = get_project_settings()
-    settings.set('LOG_LEVEL', 'ERROR', priority='cmdline')
-    settings.set('USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36', priority='cmdline')
-    process = CrawlerProcess(settings)
-    process.crawl(MarketResearchSpider, urls=','.join(urls), no_docx=True)
-    process.start()
+# Single long-lived Scrapy process (one reactor) shared by all /api/scrape requests
+scrape_worker = ScrapeWorker()
+atexit.register(scrape_worker.stop)
+# Upper bound on one /api/scrape crawl before the worker is killed and restarted
+SCRAPE_TIMEOUT_SECONDS = int(os.getenv('SCRAPE_TIMEOUT_SECONDS', '900'))
 
 @app.route('/')
 def index():
@@ -618,7 +1161,10 @@ def login():
         
         # TODO: Add rate limiting here (e.g., Flask-Limiter) to prevent brute force
         user = get_user_by_username(username)
-        if user and check_password_hash(user['password_hash'], password):
+        if user and verify_password(user['password_hash'], password):
+            if password_needs_rehash(user['password_hash']):
+                # Committed together with the last_login update below
+                get_db().execute(SQL_UPDATE_PASSWORD, (hash_password(password), user['username']))
             session['username'] = user['username']
             session['role'] = user['role']
             update_last_login(user['username'])
@@ -638,6 +1184,14 @@ def logout():
     flash('Logged out', 'info')
     return redirect(url_for('login'))
 
+# Columns rendered by the admin and researcher dashboard tables
+DASHBOARD_SUBMISSION_COLUMNS = '''
+    id, market_name, researcher_username, submitted_at, cagr,
+    COALESCE(NULLIF(value_unit, ''), 'USD Million') AS currency,
+    market_size_2024 AS value_2024,
+    segment_count, company_count, downloaded, last_downloaded_at
+'''
+
 @app.route('/auth/admin')
 @login_required(role='admin')
 def admin_dashboard():
@@ -645,81 +1199,37 @@ def admin_dashboard():
     users = list_users()
     db = get_db()
 
-    # Get total count of all submissions for metrics
-    count_cur = db.execute('SELECT COUNT(*) as total FROM rd_submissions')
-    total_submissions = count_cur.fetchone()['total']
-
-    # Get today's submission count (IST)
-    today_start = datetime.now(IST).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None).isoformat()
-    today_cur = db.execute('SELECT COUNT(*) as cnt FROM rd_submissions WHERE submitted_at >= ?', (today_start,))
-    today_submissions = today_cur.fetchone()['cnt']
+    # Total, today's (IST) and active-researcher counts in a single pass over rd_submissions
+    now = datetime.now(IST).replace(tzinfo=None)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    cutoff = (now - timedelta(days=1)).isoformat()
+    counts = db.execute('''
+        SELECT COUNT(*) AS total,
+               COUNT(CASE WHEN submitted_at >= ? THEN 1 END) AS today,
+               COUNT(DISTINCT CASE WHEN submitted_at >= ? THEN researcher_username END) AS active
+        FROM rd_submissions
+    ''', (today_start, cutoff)).fetchone()
+    total_submissions = counts['total']
+    today_submissions = counts['today']
+    active_researchers_today = counts['active']
     
-    # Get only recent 5 RD submissions for dashboard
-    cur = db.execute('''
-        SELECT id, market_name, researcher_username, json_path, file_path,
-               submitted_at, cagr, value_unit, market_size_2024, 
-               segments, companies, downloaded, last_downloaded_at
+    # Get only recent 5 RD submissions for dashboard; the template reads the
+    # sqlite3.Row objects directly (currency / value_2024 are computed in SQL)
+    submissions = db.execute(f'''
+        SELECT {DASHBOARD_SUBMISSION_COLUMNS}
         FROM rd_submissions
         ORDER BY submitted_at DESC
         LIMIT 5
-    ''')
-    submissions_raw = cur.fetchall()
-    submissions = []
-    for row in submissions_raw:
-        sub = dict(row)
-        # Parse JSON and get counts
-        try:
-            segments_list = json.loads(sub['segments']) if sub['segments'] else []
-            companies_list = json.loads(sub['companies']) if sub['companies'] else []
-            sub['segment_count'] = len(segments_list)
-            sub['company_count'] = len(companies_list)
-            sub['currency'] = sub['value_unit'] or 'USD Million'
-            sub['value_2024'] = sub['market_size_2024']
-        except Exception:
-            sub['segment_count'] = 0
-            sub['company_count'] = 0
-            sub['currency'] = 'USD Million'
-            sub['value_2024'] = 0
-        submissions.append(sub)
-
-    # Active researchers count (we need to check all submissions, not just the 5 displayed)
-    # Get all submissions for active researcher calculation
-    all_cur = db.execute('SELECT researcher_username, submitted_at FROM rd_submissions')
-    all_submissions = [dict(row) for row in all_cur.fetchall()]
-    
-    # Active researchers count
-    def parse_iso(ts):
-        try:
-            dt = datetime.fromisoformat(ts) if ts else None
-            # Make timezone-naive if timezone-aware
-            if dt and dt.tzinfo is not None:
-                dt = dt.replace(tzinfo=None)
-            return dt
-        except Exception:
-            return None
-    
-    now = datetime.now(IST).replace(tzinfo=None)
-    cutoff = now - timedelta(days=1)
-    active_researchers_today = len({s['researcher_username'] for s in all_submissions
-                                    if (parse_iso(s.get('submitted_at')) or now - timedelta(days=365)) >= cutoff})
+    ''').fetchall()
 
-    # Markets per researcher (use all submissions)
+    # Markets per researcher: one row per distinct (researcher, market) pair
     markets_by_researcher = {}
-    for s in all_submissions:
-        r = s['researcher_username']
-        # Get market name from full submission if needed
-        if r not in markets_by_researcher:
-            markets_by_researcher[r] = set()
-    
-    # Get market names for all submissions
-    markets_cur = db.execute('SELECT researcher_username, market_name FROM rd_submissions')
+    markets_cur = db.execute('SELECT DISTINCT researcher_username, market_name FROM rd_submissions')
     for row in markets_cur.fetchall():
-        r = row['researcher_username']
+        markets = markets_by_researcher.setdefault(row['researcher_username'], set())
         m = (row['market_name'] or '').strip()
-        if r not in markets_by_researcher:
-            markets_by_researcher[r] = set()
         if m:
-            markets_by_researcher[r].add(m)
+            markets.add(m)
 
     # Role counts
     researchers_count = sum(1 for u in users if u['role'] == 'researcher')
@@ -741,12 +1251,20 @@ def download_submissions_excel():
     """Download all submissions as Excel file"""
     db = get_db()
     
-    # Get all RD submissions with full details
+    # Get all RD submissions with full details. The segment/company lists are
+    # joined into comma-separated strings by SQLite's JSON1 (malformed JSON -> '')
+    # and the counts come from the stored columns, so no blob is parsed in Python.
     cur = db.execute('''
         SELECT id, market_name, researcher_username, submitted_at, 
                sector, industry_group, industry, sub_industry,
                cagr, value_unit, market_size_2024, projected_size_2033,
-               segments, companies, downloaded
+               segment_count, company_count, downloaded,
+               CASE WHEN json_valid(segments) THEN (
+                   SELECT group_concat(value, ', ') FROM (SELECT value FROM json_each(segments) ORDER BY key)
+               ) END AS segments_str,
+               CASE WHEN json_valid(companies) THEN (
+                   SELECT group_concat(value, ', ') FROM (SELECT value FROM json_each(companies) ORDER BY key)
+               ) END AS companies_str
         FROM rd_submissions
         ORDER BY submitted_at DESC
     ''')
@@ -755,22 +1273,10 @@ def download_submissions_excel():
     # Prepare data for Excel
     excel_data = []
     for row in submissions_raw:
-        # Parse segments and companies
-        try:
-            segments_list = json.loads(row['segments']) if row['segments'] else []
-            companies_list = json.loads(row['companies']) if row['companies'] else []
-            segment_count = len(segments_list)
-            company_count = len(companies_list)
-            
-            # Format segments as comma-separated string
-            segments_str = ', '.join([seg if isinstance(seg, str) else str(seg) for seg in segments_list])
-            # Format companies as comma-separated string
-            companies_str = ', '.join([comp if isinstance(comp, str) else str(comp) for comp in companies_list])
-        except Exception:
-            segment_count = 0
-            company_count = 0
-            segments_str = ''
-            companies_str = ''
+        segment_count = row['segment_count'] or 0
+        company_count = row['company_count'] or 0
+        segments_str = row['segments_str'] or ''
+        companies_str = row['companies_str'] or ''
         
         # Determine status based on downloaded field
         # If downloaded = 1, show "Uploaded", otherwise show status based on value
@@ -857,12 +1363,11 @@ def admin_researchers():
 @login_required(role='admin')
 def admin_analytics():
     """Analytics: per-researcher active time + segment similarity per title"""
-    import re
     from collections import defaultdict
 
     def strip_num(s):
         """Remove leading outline numbers (1. / 1.1. / 1.1.1. etc.) and normalise."""
-        return re.sub(r'^\d+(\.\d+)*\.\s*', '', s).strip().lower()
+        return NUM_PREFIX_RE.sub('', s, count=1).strip().lower()
 
     db = get_db()
     rows = db.execute('''
@@ -878,8 +1383,8 @@ def admin_analytics():
 
         # ── Segment diff (ignore numbers + order) ──────────────────────
         try:
-            ai_raw   = json.loads(r['ai_gen_seg'] or '[]')
-            fin_raw  = json.loads(r['segments']   or '[]')
+            ai_raw   = orjson.loads(r['ai_gen_seg'] or '[]')
+            fin_raw  = orjson.loads(r['segments']   or '[]')
         except Exception:
             ai_raw, fin_raw = [], []
 
@@ -899,7 +1404,7 @@ def admin_analytics():
             for s in raw:
                 k = strip_num(s)
                 if k in keys:
-                    out.append(re.sub(r'^\d+(\.\d+)*\.\s*', '', s).strip())
+                    out.append(NUM_PREFIX_RE.sub('', s, count=1).strip())
             return sorted(set(out))
 
         # Ordered display lists WITH original numbering for the modal view
@@ -963,35 +1468,64 @@ def admin_analytics():
     ]
     return render_template('auth/admin_analytics.html', researcher_stats=researcher_stats)
 
+# Rows per page on the admin submissions view
+SUBMISSIONS_PAGE_SIZE = 50
+
+# Column list for the admin submissions view; rows are passed to the template as
+# lightweight tuples instead of per-row dicts
+Submission = namedtuple('Submission', [
+    'id', 'market_name', 'researcher_username', 'submitted_at', 'timestamp',
+    'sector', 'industry_group', 'industry', 'sub_industry',
+    'value_unit', 'cagr', 'market_size_2024', 'market_size_2025', 'projected_size_2033',
+    'segments', 'ai_gen_seg', 'companies', 'created_by', 'version',
+    'downloaded', 'last_downloaded_at', 'segment_count', 'company_count',
+])
+
 @app.route('/auth/admin/submissions')
 @login_required(role='admin')
 def admin_submissions():
     """Detailed submissions view with all JSON data"""
     db = get_db()
-    cur = db.execute('''
-        SELECT id, market_name, researcher_username, submitted_at, timestamp,
-               sector, industry_group, industry, sub_industry,
-               value_unit, cagr, market_size_2024, market_size_2025, projected_size_2033,
-               segments, ai_gen_seg, companies, created_by, version,
-               downloaded, last_downloaded_at
+    # Keyset pagination on (submitted_at, id): the cursor is the last row of the
+    # previous page, so SQLite walks the index instead of skipping OFFSET rows
+    before = request.args.get('before')
+    before_id = request.args.get('before_id', type=int)
+    where, params = '', []
+    # before can be '' (the last rows of a backfilled database sort as '')
+    if before is not None and before_id is not None:
+        where = 'WHERE (submitted_at, id) < (?, ?)'
+        params = [before, before_id]
+    cur = db.execute(f'''
+        SELECT {', '.join(Submission._fields)}
         FROM rd_submissions
-        ORDER BY submitted_at DESC
-    ''')
-    submissions = []
-    for row in cur.fetchall():
-        sub = dict(row)
-        # Parse JSON fields
-        try:
-            sub['segments'] = json.loads(sub['segments']) if sub['segments'] else []
-            sub['ai_gen_seg'] = json.loads(sub['ai_gen_seg']) if sub['ai_gen_seg'] else []
-            sub['companies'] = json.loads(sub['companies']) if sub['companies'] else []
-        except Exception:
-            sub['segments'] = []
-            sub['ai_gen_seg'] = []
-            sub['companies'] = []
-        submissions.append(sub)
+        {where}
+        ORDER BY submitted_at DESC, id DESC
+        LIMIT ?
+    ''', params + [SUBMISSIONS_PAGE_SIZE + 1])
+    rows = cur.fetchall()
+    has_more = len(rows) > SUBMISSIONS_PAGE_SIZE
+    rows = rows[:SUBMISSIONS_PAGE_SIZE]
+    total_submissions = db.execute('SELECT COUNT(*) FROM rd_submissions').fetchone()[0]
+    # segments/ai_gen_seg/companies stay raw JSON strings; the table only shows
+    # the stored counts and the detail modal parses them client-side
+    submissions = [Submission(*row) for row in rows]
     
-    return render_template('auth/admin_submissions.html', submissions=submissions)
+    next_url = None
+    if has_more:
+        last = submissions[-1]
+        next_url = url_for('admin_submissions', before=last.submitted_at, before_id=last.id)
+
+    response = make_response(render_template(
+        'auth/admin_submissions.html',
+        submissions=submissions,
+        submission_fields=Submission._fields,
+        total_submissions=total_submissions,
+        first_page=not where,
+        next_url=next_url,
+    ))
+    if next_url:
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @app.route('/auth/researcher')
 @login_required(role='researcher')
@@ -1001,32 +1535,12 @@ def researcher_dashboard():
     username = session.get('username')
     
     # Get all RD submissions by this researcher
-    cur = db.execute('''
-        SELECT id, market_name, researcher_username, json_path, file_path,
-               submitted_at, cagr, value_unit, market_size_2024,
-               segments, companies, downloaded, last_downloaded_at
+    submissions = db.execute(f'''
+        SELECT {DASHBOARD_SUBMISSION_COLUMNS}
         FROM rd_submissions
         WHERE researcher_username = ?
         ORDER BY submitted_at DESC
-    ''', (username,))
-    submissions_raw = cur.fetchall()
-    submissions = []
-    for row in submissions_raw:
-        sub = dict(row)
-        # Parse JSON and get counts
-        try:
-            segments_list = json.loads(sub['segments']) if sub['segments'] else []
-            companies_list = json.loads(sub['companies']) if sub['companies'] else []
-            sub['segment_count'] = len(segments_list)
-            sub['company_count'] = len(companies_list)
-            sub['currency'] = sub['value_unit'] or 'USD Million'
-            sub['value_2024'] = sub['market_size_2024']
-        except Exception:
-            sub['segment_count'] = 0
-            sub['company_count'] = 0
-            sub['currency'] = 'USD Million'
-            sub['value_2024'] = 0
-        submissions.append(sub)
+    ''', (username,)).fetchall()
 
     # Get today's submission count for this researcher (IST)
     today_start = datetime.now(IST).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None).isoformat()
@@ -1051,24 +1565,14 @@ def researcher_submissions():
                sector, industry_group, industry, sub_industry,
                value_unit, cagr, market_size_2024, market_size_2025, projected_size_2033,
                segments, ai_gen_seg, companies, created_by, version,
-               downloaded, last_downloaded_at
+               downloaded, last_downloaded_at, segment_count, company_count
         FROM rd_submissions
         WHERE researcher_username = ?
         ORDER BY submitted_at DESC
-    ''', (username,))
-    submissions = []
-    for row in cur.fetchall():
-        sub = dict(row)
-        # Parse JSON fields
-        try:
-            sub['segments'] = json.loads(sub['segments']) if sub['segments'] else []
-            sub['ai_gen_seg'] = json.loads(sub['ai_gen_seg']) if sub['ai_gen_seg'] else []
-            sub['companies'] = json.loads(sub['companies']) if sub['companies'] else []
-        except Exception:
-            sub['segments'] = []
-            sub['ai_gen_seg'] = []
-            sub['companies'] = []
-        submissions.append(sub)
+    ''', (username,))
+    # segments/ai_gen_seg/companies stay raw JSON strings; the table only shows
+    # the stored counts and the detail modal parses them client-side
+    submissions = [dict(row) for row in cur]
     
     return render_template('auth/researcher_submissions.html', username=username, submissions=submissions)
 
@@ -1099,12 +1603,12 @@ def change_password():
         return redirect(url_for('profile'))
     username = session.get('username')
     user = get_user_by_username(username)
-    if not user or not check_password_hash(user['password_hash'], current_password):
+    if not user or not verify_password(user['password_hash'], current_password):
         flash('Current password is incorrect', 'danger')
         return redirect(url_for('profile'))
     db = get_db()
-    new_hash = generate_password_hash(new_password, method='pbkdf2:sha256', salt_length=16)
-    db.execute('UPDATE users SET password_hash = ? WHERE username = ?', (new_hash, username))
+    new_hash = hash_password(new_password)
+    db.execute(SQL_UPDATE_PASSWORD, (new_hash, username))
     db.commit()
     flash('Password changed successfully', 'success')
     return redirect(url_for('profile'))
@@ -1116,7 +1620,7 @@ def admin_change_password():
     """Admin can change their own password or any user's password.
     Body: {"username": "<user>", "new_password": "<password>"}
     """
-    data = request.json or {}
+    data = request.get_json(silent=True) or {}
     target = (data.get('username') or '').strip()
     new_password = (data.get('new_password') or '').strip()
 
@@ -1135,8 +1639,8 @@ def admin_change_password():
         return jsonify({'error': 'User not found'}), 404
 
     # Update password
-    password_hash = generate_password_hash(new_password, method='pbkdf2:sha256', salt_length=16)
-    db.execute('UPDATE users SET password_hash = ? WHERE username = ?', (password_hash, target))
+    password_hash = hash_password(new_password)
+    db.execute(SQL_UPDATE_PASSWORD, (password_hash, target))
     db.commit()
 
     return jsonify({'status': 'ok', 'message': f'Password changed for {target}'})
@@ -1153,7 +1657,7 @@ def admin_delete_user():
       - cannot delete other admin users
     Body: {"username": "<user>"}
     """
-    data = request.json or {}
+    data = request.get_json(silent=True) or {}
     target = (data.get('username') or '').strip()
     if not target:
         return jsonify({'error': 'Missing `username`'}), 400
@@ -1161,54 +1665,168 @@ def admin_delete_user():
     if target == me:
         return jsonify({'error': 'You cannot delete your own account'}), 400
     db = get_db()
-    # Check role of target
-    cur = db.execute('SELECT role FROM users WHERE username = ?', (target,))
-    row = cur.fetchone()
-    if not row:
-        return jsonify({'error': 'User not found'}), 404
-    role = row['role']
-    if role == 'admin':
-        return jsonify({'error': 'Cannot delete another admin'}), 400
-    # Delete related RD submissions
-    db.execute('DELETE FROM rd_submissions WHERE researcher_username = ?', (target,))
-    # Delete user
-    db.execute('DELETE FROM users WHERE username = ?', (target,))
-    db.commit()
+    with transaction(db):
+        # Role check folded into the DELETE; the follow-up lookup only runs on failure
+        deleted = db.execute(
+            "DELETE FROM users WHERE username = ? AND role <> 'admin'", (target,)
+        ).rowcount
+        if not deleted:
+            exists = db.execute('SELECT 1 FROM users WHERE username = ?', (target,)).fetchone()
+            if exists is None:
+                return jsonify({'error': 'User not found'}), 404
+            return jsonify({'error': 'Cannot delete another admin'}), 400
+        # Delete related RD submissions
+        db.execute('DELETE FROM rd_submissions WHERE researcher_username = ?', (target,))
     return jsonify({'status': 'ok', 'deleted': target})
 
 @app.route('/api/scrape', methods=['POST'])
 @login_required(role=('researcher','admin'))
 def scrape():
     """Endpoint to scrape URLs and return JSON results"""
-    urls = request.json.get('urls', [])
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls', [])
     if not urls:
         return jsonify({'error': 'No URLs provided'}), 400
 
     output_dir = 'scraped_json'
     os.makedirs(output_dir, exist_ok=True)
 
-    # Run Scrapy in a separate process
-    p = Process(target=run_spider, args=(urls, output_dir))
-    p.start()
-    p.join()  # Wait for the process to complete
+    # Run the crawl in the persistent Scrapy worker and wait for it to finish
+    crawl_error = scrape_worker.crawl(urls, timeout=SCRAPE_TIMEOUT_SECONDS)
+    if crawl_error:
+        print(f"Scrapy crawl failed: {crawl_error}")
 
-    # Collect JSON files from scraped_json directory
-    json_files = glob.glob(os.path.join(output_dir, '*.json'))
+    # Collect JSON files from scraped_json directory, then clear them in one pass
+    with os.scandir(output_dir) as it:
+        json_files = [e.path for e in it if e.name.endswith('.json') and not e.name.startswith('.')]
     results = []
     for json_file in json_files:
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                results.append(json.load(f))
+            with open(json_file, 'rb') as f:
+                results.append(orjson.loads(f.read()))
         except Exception as e:
             print(f"Error reading {json_file}: {e}")
-        finally:
-            try:
-                os.remove(json_file)
-            except OSError as e:
-                print(f"Error removing file {json_file}: {e}")
+    for json_file in json_files:
+        try:
+            os.unlink(json_file)
+        except OSError as e:
+            print(f"Error removing file {json_file}: {e}")
 
     return jsonify(results)
 
+# Generated downloads stay in memory up to this size, then spill to a temp file
+DOWNLOAD_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+def send_spooled_file(output, download_name, mimetype):
+    """send_file() for a freshly written SpooledTemporaryFile, keeping Content-Length."""
+    size = output.tell()
+    output.seek(0)
+    response = send_file(output, download_name=download_name, as_attachment=True, mimetype=mimetype)
+    response.content_length = size
+    return response
+
+# Upper bound on report processes per /api/generate-report call; each report spends
+# most of its time waiting on OpenAI, so this is not tied to the CPU count
+DOCX_POOL_MAX_WORKERS = 4
+# Long multi-step jobs (SkyQuest submission) that mostly wait on network I/O
+BACKGROUND_JOB_MAX_WORKERS = 2
+
+_docx_pool = None
+_docx_pool_lock = threading.Lock()
+background_jobs = ThreadPoolExecutor(max_workers=BACKGROUND_JOB_MAX_WORKERS, thread_name_prefix='job')
+
+def submit_docx_task(fn, *args, **kwargs):
+    """Run a DOCX build in the shared worker process pool; returns its Future.
+
+    python-docx work is CPU-bound pure Python, so it runs in processes. The
+    pool starts on first use and is replaced if a worker process died.
+    """
+    global _docx_pool
+    with _docx_pool_lock:
+        for _ in range(2):
+            if _docx_pool is None:
+                _docx_pool = ProcessPoolExecutor(max_workers=DOCX_POOL_MAX_WORKERS)
+            try:
+                return _docx_pool.submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                _docx_pool = None
+        raise BrokenProcessPool('DOCX worker pool could not be restarted')
+
+@atexit.register
+def shutdown_job_pools():
+    background_jobs.shutdown(wait=False, cancel_futures=True)
+    with _docx_pool_lock:
+        if _docx_pool is not None:
+            _docx_pool.shutdown(wait=False, cancel_futures=True)
+
+# Jobs started by request handlers and polled through /api/job-status/<job_id>.
+# on_done maps the future's result to the (payload, status) the poll returns.
+Job = namedtuple('Job', 'future owner on_done error_prefix created')
+jobs = {}
+jobs_lock = threading.Lock()
+# Finished jobs nobody polled are dropped (with their results) once they are this
+# old; far longer than any job runs, so a client that is still polling never loses one
+JOB_RESULT_TTL_SECONDS = 6 * 60 * 60
+
+def start_job(future, on_done, error_prefix):
+    """Register a running future for the current user and return its job id.
+
+    Also evicts finished jobs older than JOB_RESULT_TTL_SECONDS, so results of
+    jobs that are never polled don't pile up. Jobs need a logged-in owner, since
+    job_status only hands results to that user.
+    """
+    owner = session.get('username')
+    if owner is None:
+        future.cancel()
+        raise RuntimeError('Background jobs require a logged-in user')
+    job_id = uuid.uuid4().hex
+    now = time.monotonic()
+    with jobs_lock:
+        expired = [jid for jid, job in jobs.items()
+                   if job.future.done() and now - job.created > JOB_RESULT_TTL_SECONDS]
+        for jid in expired:
+            del jobs[jid]
+        jobs[job_id] = Job(future, owner, on_done, error_prefix, now)
+    return job_id
+
+def run_view_in_app_context(view, *args):
+    """Background-thread wrapper for a view-style function: returns (payload, status)."""
+    with app.app_context():
+        response = app.make_response(view(*args))
+        return response.get_json(), response.status_code
+
+@app.route('/api/job-status/<job_id>')
+@login_required()
+def job_status(job_id):
+    """Poll a background job; the finished result is handed out once."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is None or job.owner is None or job.owner != session.get('username'):
+            return jsonify({'error': 'Unknown job'}), 404
+        if not job.future.done():
+            return jsonify({'done': False}), 200
+        del jobs[job_id]
+    try:
+        payload, status = job.on_done(job.future.result())
+    except Exception as e:
+        app.logger.exception(f'Background job {job_id} failed')
+        return jsonify({'done': True, 'error': f'{job.error_prefix}: {str(e)}'}), 500
+    return jsonify({'done': True, **payload}), status
+
+def render_report_docx(report):
+    """Worker entry point: build one report into a fresh Document and return its .docx bytes."""
+    buf = io.BytesIO()
+    generate_docx_from_data(report, doc=Document()).save(buf)
+    return buf.getvalue()
+
+def append_docx_body(target, source):
+    """Append source's body content to target, keeping target's final section properties."""
+    target_sect = target.element.body.sectPr
+    for element in list(source.element.body):
+        if element.tag == qn('w:sectPr'):
+            continue
+        target_sect.addprevious(element)
+
 @app.route('/api/generate-report', methods=['POST'])
 @login_required(role=('researcher','admin'))
 def generate_report():
@@ -1219,7 +1837,7 @@ def generate_report():
     for report creation. If 'reports' are provided, they will be used as source
     content but their ToC will be overridden by the provided 'segments'.
     """
-    data = request.json or {}
+    data = request.get_json(silent=True) or {}
     segments = data.get('segments')
     reports = data.get('reports', [])
 
@@ -1231,53 +1849,11 @@ def generate_report():
                 segments = first_report.get('table_of_contents')
                 print(f"DEBUG: Extracted segments from reports[0].table_of_contents: {len(segments) if isinstance(segments, list) else 0} segments")
 
-    # If segments STILL missing, first check autosaved 'latest_segments.json', then saved files
+    # If segments STILL missing, fall back to the autosaved / saved segment files
     if not isinstance(segments, list) or len(segments) == 0:
-        try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            saved_data_dir = os.path.join(current_dir, 'saved_data')
-            if os.path.exists(saved_data_dir):
-                    # Check autosave file first (prefer short_rd_data folder)
-                short_rd_dir = os.path.join(saved_data_dir, 'short_rd_data')
-                latest_path_legacy = os.path.join(saved_data_dir, 'latest_segments.json')
-
-                # Look for most recent short RD autosave file by market name
-                if os.path.exists(short_rd_dir):
-                    short_files = glob.glob(os.path.join(short_rd_dir, '*.json'))
-                    if short_files:
-                        latest_short = max(short_files, key=os.path.getctime)
-                        try:
-                            with open(latest_short, 'r', encoding='utf-8') as f:
-                                latest = json.load(f)
-                                latest_segments = latest.get('segments')
-                                if isinstance(latest_segments, list) and len(latest_segments) > 0:
-                                    segments = latest_segments
-                        except Exception:
-                            app.logger.exception(f'Failed to read short RD autosave file: {latest_short}')
-                elif os.path.exists(latest_path_legacy):
-                    # Back-compat: check older autosave location
-                    with open(latest_path_legacy, 'r', encoding='utf-8') as f:
-                        latest = json.load(f)
-                        latest_segments = latest.get('segments')
-                        if isinstance(latest_segments, list) and len(latest_segments) > 0:
-                            segments = latest_segments
-
-                # Fallback to the most recent full saved JSON file (include full_rd_data folder first)
-                if not (isinstance(segments, list) and len(segments) > 0):
-                    full_rd_dir = os.path.join(saved_data_dir, 'full_rd_data')
-                    json_files = []
-                    if os.path.exists(full_rd_dir):
-                        json_files.extend(glob.glob(os.path.join(full_rd_dir, '*.json')))
-                    json_files.extend(glob.glob(os.path.join(saved_data_dir, '*.json')))
-                    if json_files:
-                        saved_json_file = max(json_files, key=os.path.getctime)
-                        with open(saved_json_file, 'r', encoding='utf-8') as f:
-                            saved_data = json.load(f)
-                            saved_segments = saved_data.get('segments')
-                            if isinstance(saved_segments, list) and len(saved_segments) > 0:
-                                segments = saved_segments
-        except Exception:
-            pass
+        saved_segments = load_autosaved_segments()
+        if saved_segments:
+            segments = saved_segments
 
     # Validate segments (final UI view segments are required either in request or saved_data)
     if not isinstance(segments, list) or len(segments) == 0:
@@ -1289,28 +1865,39 @@ def generate_report():
     combined_doc = Document()
 
     # Ensure each report uses the UI-provided segments as its table_of_contents
+    reports = [report if isinstance(report, dict) else {'title': str(report)} for report in reports]
     for report in reports:
+        # Trust UI segments exactly as provided (do not modify)
+        report['table_of_contents'] = segments
+        print(f"Processing report: {orjson.dumps(report, option=orjson.OPT_INDENT_2).decode()}")
+
+    if len(reports) == 1:
+        report = reports[0]
         try:
-            if not isinstance(report, dict):
-                report = {'title': str(report)}
-            # Trust UI segments exactly as provided (do not modify)
-            report['table_of_contents'] = segments
-            print(f"Processing report: {json.dumps(report, indent=2)}")
             generate_docx_from_data(report, doc=combined_doc)
         except Exception as e:
             print(f"Error processing report {report.get('title', 'Unknown')}: {e}")
-            combined_doc.add_paragraph(f"Error processing report: {report.get('title', 'Unknown')}: {str(e)}")
             return jsonify({'error': f"Failed to process report {report.get('title', 'Unknown')}: {str(e)}"}), 500
+    else:
+        # Build each report in its own worker process (data.py keeps per-market state in
+        # module globals), then splice the bodies into combined_doc in request order
+        futures = [submit_docx_task(render_report_docx, report) for report in reports]
+        for report, future in zip(reports, futures):
+            try:
+                append_docx_body(combined_doc, Document(io.BytesIO(future.result())))
+            except Exception as e:
+                print(f"Error processing report {report.get('title', 'Unknown')}: {e}")
+                for f in futures:
+                    f.cancel()
+                return jsonify({'error': f"Failed to process report {report.get('title', 'Unknown')}: {str(e)}"}), 500
 
-    # Save the combined document to a BytesIO object
-    output = io.BytesIO()
+    # Save the combined document to a spooled temp file (spills to disk for large reports)
+    output = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_BYTES)
     try:
         combined_doc.save(output)
-        output.seek(0)
-        return send_file(
+        return send_spooled_file(
             output,
             download_name='market_research_report.docx',
-            as_attachment=True,
             mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
         )
     except Exception as e:
@@ -1321,7 +1908,7 @@ def generate_report():
 @login_required(role=('researcher','admin'))
 def generate_ai_segments_endpoint():
     """Endpoint to generate segments using AI based on title"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     title = data.get('title', '').strip()
     
     if not title:
@@ -1339,7 +1926,7 @@ def generate_ai_segments_endpoint():
 @login_required(role=('researcher','admin'))
 def analyze_ai_segments_endpoint():
     """Endpoint to analyze scraped segmentation and generate consolidated segments"""
-    data = request.json or {}
+    data = request.get_json(silent=True) or {}
     title = (data.get('title') or '').strip()
     scraped_segments = data.get('scraped_segments') or []
 
@@ -1370,7 +1957,7 @@ def correct_segments_endpoint():
     try:
         from segment_model.predict import get_corrector
         
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         market_name = (data.get('market_name') or '').strip()
         segments = data.get('segments') or []
         confidence = float(data.get('confidence', 0.5))
@@ -1392,8 +1979,7 @@ def correct_segments_endpoint():
             'corrected_count': len(result['corrected_segments']),
         })
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Segment correction failed: {e}')
         return jsonify({'error': f'Segment correction failed: {str(e)}'}), 500
 
 @app.route('/api/generate-corrected-segments', methods=['POST'])
@@ -1414,7 +2000,7 @@ def generate_corrected_segments_endpoint():
     try:
         from segment_model.generate import generate_segments
         
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         market_name = (data.get('market_name') or '').strip()
         confidence = float(data.get('confidence', 0.5))
         
@@ -1434,8 +2020,7 @@ def generate_corrected_segments_endpoint():
             'similar_markets': result['similar_markets'],
         })
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Segment generation failed: {e}')
         return jsonify({'error': f'Generation failed: {str(e)}'}), 500
 
 @app.route('/api/retrain-segment-model', methods=['POST'])
@@ -1450,56 +2035,41 @@ def retrain_segment_model_endpoint():
         pred_mod._corrector_instance = None
         return jsonify({'success': True, 'message': 'Model retrained successfully'})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Segment model retrain failed: {e}')
         return jsonify({'error': f'Retrain failed: {str(e)}'}), 500
 
 @app.route('/api/generate-image', methods=['POST'])
 def generate_image_endpoint():
     """Endpoint to generate image based on title"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         title = (data.get('title') or '').strip()
         
         if not title:
             return jsonify({'error': 'Title is required'}), 400
         
-        # Import here to avoid import issues
-        import sys
-        import os
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        if current_dir not in sys.path:
-            sys.path.insert(0, current_dir)
-        
-        from image_gen import generate_market_image
+        if generate_market_image is None:
+            return jsonify({'error': f'Image generation unavailable: {IMAGE_GEN_IMPORT_ERROR}'}), 500
         
         # Generate the image
         output_file = generate_market_image(title)
         
-        # Read the generated image file
-        with open(output_file, 'rb') as f:
-            image_data = f.read()
-        
-        # Return image as base64
-        import base64
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
-        
-        return jsonify({
-            'success': True,
-            'image': f'data:image/webp;base64,{image_base64}',
-            'filename': output_file
-        })
+        # Send the webp bytes as-is; the page shows them through an object URL
+        return send_file(
+            os.path.abspath(output_file),
+            mimetype='image/webp',
+            as_attachment=False,
+            download_name=os.path.basename(output_file)
+        )
     except Exception as e:
-        print(f"Error generating image: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Error generating image: {e}')
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/generate-companies', methods=['POST'])
 @login_required(role=('researcher','admin'))
 def generate_companies_endpoint():
     """Endpoint to validate and generate company profiles for a market"""
-    data = request.json or {}
+    data = request.get_json(silent=True) or {}
     market_name = (data.get('market_name') or '').strip()
     scraped_companies = data.get('scraped_companies') or []
     
@@ -1513,52 +2083,72 @@ def generate_companies_endpoint():
     
     return jsonify(result)
 
+DominatingRegionIndex = namedtuple('DominatingRegionIndex', 'names lowered by_name prefix_sorted')
+
+@lru_cache(maxsize=4)
+def _dominating_region_index(folder, mtime_ns):
+    """Index of the *.json files in folder; mtime_ns is only part of the cache key."""
+    names = [name for name in os.listdir(folder) if name.endswith('.json')]
+    lowered = [name.lower() for name in names]
+    by_name = {}
+    for name, low in zip(names, lowered):
+        by_name.setdefault(low[:-len('.json')], name)
+    return DominatingRegionIndex(names, lowered, by_name, sorted(zip(lowered, names)))
+
+def dominating_region_index():
+    """Cached index of dominating_region/*.json (rebuilt when the folder changes), or None if it is missing."""
+    try:
+        return _dominating_region_index(DOMINATING_REGION_DIR, os.stat(DOMINATING_REGION_DIR).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+def find_dominating_region_json(index, market_name, prefix_fallbacks=False):
+    """Path of the dominating_region JSON file for market_name, or None.
+
+    A file named exactly after the market wins, else the first file whose
+    name contains it. With prefix_fallbacks, also try the name without
+    ' market' as a filename prefix and then the first 30 characters anywhere
+    in the filename.
+    """
+    key = market_name.lower()
+    name = index.by_name.get(key)
+    if name is None:
+        name = next((n for n, low in zip(index.names, index.lowered) if key in low), None)
+    if name is None and prefix_fallbacks:
+        base = key.replace(' market', '').strip()
+        i = bisect_left(index.prefix_sorted, (base,))
+        if i < len(index.prefix_sorted) and index.prefix_sorted[i][0].startswith(base):
+            name = index.prefix_sorted[i][1]
+        elif len(market_name) > 30:
+            prefix = key[:30]
+            name = next((n for n, low in zip(index.names, index.lowered) if prefix in low), None)
+    return os.path.join(DOMINATING_REGION_DIR, name) if name else None
+
 @app.route('/api/generate-excel', methods=['POST'])
 @login_required(role=('researcher','admin'))
 def generate_excel_endpoint():
     """Endpoint to generate Excel file from JSON data in dominating_region folder"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         market_name = (data.get('market_name') or '').strip()
         
         if not market_name:
             return jsonify({'error': 'Market name is required'}), 400
         
-        # Import excel_gen module
-        import sys
-        import os
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        multi_scraper_dir = os.path.join(current_dir, 'multi_scraper')
-        
-        if multi_scraper_dir not in sys.path:
-            sys.path.insert(0, multi_scraper_dir)
-        
-        from excel_gen import generate_excel, clean_filename
-        
-        # Build path to dominating_region folder (same level as app.py)
-        dominating_region_dir = os.path.join(current_dir, 'dominating_region')
-        dominating_region_dir = os.path.abspath(dominating_region_dir)
-        
         # Check if folder exists
-        if not os.path.exists(dominating_region_dir):
-            return jsonify({'error': f'dominating_region folder not found at {dominating_region_dir}'}), 404
+        index = dominating_region_index()
+        if index is None:
+            return jsonify({'error': f'dominating_region folder not found at {DOMINATING_REGION_DIR}'}), 404
         
-        # Find JSON file matching market_name
-        json_files = [f for f in os.listdir(dominating_region_dir) if f.endswith('.json')]
-        
-        if not json_files:
+        if not index.names:
             return jsonify({'error': 'No JSON files found in dominating_region folder'}), 404
         
         # Try to find an exact match or use the first file
-        json_path = None
-        for json_file in json_files:
-            if market_name.lower() in json_file.lower():
-                json_path = os.path.join(dominating_region_dir, json_file)
-                break
+        json_path = find_dominating_region_json(index, market_name)
         
         # If no match found, use the most recent or first file
         if not json_path:
-            json_path = os.path.join(dominating_region_dir, json_files[0])
+            json_path = os.path.join(DOMINATING_REGION_DIR, index.names[0])
         
         # Check if JSON file exists
         if not os.path.exists(json_path):
@@ -1568,27 +2158,81 @@ def generate_excel_endpoint():
         wb, extracted_market_name = generate_excel(json_path)
         
         # Save to BytesIO for download
-        output = io.BytesIO()
+        output = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_BYTES)
         wb.save(output)
-        output.seek(0)
         
         # Generate safe filename
         safe_name = clean_filename(extracted_market_name or market_name)
         excel_filename = f"{safe_name}.xlsx"
         
-        return send_file(
+        return send_spooled_file(
             output,
             download_name=excel_filename,
-            as_attachment=True,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
     
     except Exception as e:
-        print(f"Error generating Excel: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Error generating Excel: {e}')
         return jsonify({'error': f'Failed to generate Excel: {str(e)}'}), 500
 
+# rd_submissions columns written by /api/save-data, in build_submission_row() order
+SUBMISSION_COLUMNS = (
+    'market_name', 'researcher_username', 'json_path', 'submitted_at', 'timestamp',
+    'sector', 'industry_group', 'industry', 'sub_industry',
+    'value_unit', 'cagr', 'market_size_2024', 'market_size_2025', 'projected_size_2033',
+    'segments', 'ai_gen_seg', 'companies', 'created_by', 'version', 'active_seconds', 'additional_kmi',
+    'segment_count', 'company_count',
+)
+# Single-statement upsert on the unique market_name index; file_path and
+# download tracking of an existing row are left untouched, and a save without
+# active_seconds keeps the previously recorded value
+SQL_UPSERT_SUBMISSION = (
+    f"INSERT INTO rd_submissions ({', '.join(SUBMISSION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(SUBMISSION_COLUMNS))}) "
+    "ON CONFLICT(market_name) DO UPDATE SET "
+    + ', '.join(
+        'active_seconds = COALESCE(excluded.active_seconds, active_seconds)' if col == 'active_seconds'
+        else f'{col} = excluded.{col}'
+        for col in SUBMISSION_COLUMNS if col != 'market_name'
+    )
+)
+
+def build_submission_row(save_data, json_path, active_seconds):
+    """Parameters for SQL_UPSERT_SUBMISSION from the saved JSON payload."""
+    industry_classification = save_data['industryClassification']
+    market_inputs = save_data['marketInputs']
+    segments = save_data['segments']
+    companies = save_data['companies']
+    # The three JSON columns, serialized once here for whichever row the upsert writes
+    segments_json = orjson.dumps(segments).decode()
+    ai_gen_seg_json = orjson.dumps(save_data['ai_gen_seg']).decode()
+    companies_json = orjson.dumps(companies).decode()
+    return (
+        save_data['title'],
+        save_data['createdBy'],
+        json_path,
+        now_ist(),
+        save_data['timestamp'],
+        industry_classification.get('sector'),
+        industry_classification.get('industryGroup'),
+        industry_classification.get('industry'),
+        industry_classification.get('subIndustry'),
+        market_inputs.get('valueUnit'),
+        market_inputs.get('cagr2025_2033'),
+        market_inputs.get('marketSize2024'),
+        market_inputs.get('marketSize2025'),
+        market_inputs.get('projectedSize2033'),
+        segments_json,
+        ai_gen_seg_json,
+        companies_json,
+        save_data['createdBy'],
+        save_data['version'],
+        active_seconds,
+        save_data['additional_kmi'],
+        len(segments),
+        len(companies),
+    )
+
 @app.route('/api/save-data', methods=['POST'])
 @login_required()
 def save_data_endpoint():
@@ -1598,7 +2242,7 @@ def save_data_endpoint():
     (original AI-generated segments, unchanged).
     """
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         
         # Validate required fields
         title = (data.get('title') or '').strip()
@@ -1626,12 +2270,13 @@ def save_data_endpoint():
         def flatten_ai_list(items):
             out = []
             def walk(arr, prefix=''):
-                for idx, it in enumerate(arr):
-                    num = f"{prefix}{idx+1}" if prefix == '' else f"{prefix}.{idx+1}"
+                # prefix already carries the parent's number and trailing dot
+                for idx, it in enumerate(arr, 1):
+                    num = f"{prefix}{idx}"
                     if isinstance(it, str):
                         s = it.strip()
                         # If already numbered like '1. ...', keep it; else, format with computed num
-                        if re.match(r'^\d+(?:\.\d+)*\.\s*', s):
+                        if NUM_PREFIX_RE.match(s):
                             out.append(s)
                         else:
                             out.append(f"{num}. {s}")
@@ -1641,7 +2286,7 @@ def save_data_endpoint():
                             out.append(f"{num}. {name}")
                         subs = it.get('subsegments') or []
                         if isinstance(subs, list) and len(subs) > 0:
-                            walk(subs, num)
+                            walk(subs, num + '.')
                     else:
                         # ignore unsupported items
                         continue
@@ -1651,18 +2296,16 @@ def save_data_endpoint():
                 app.logger.exception('Error while flattening ai_gen_seg')
             return out
 
-        if ai_gen_seg is None:
-            ai_flat = []
-        else:
-            if isinstance(ai_gen_seg, list):
-                # If all items are strings, use as-is (trimmed)
-                if all(isinstance(x, str) for x in ai_gen_seg):
-                    ai_flat = [x.strip() for x in ai_gen_seg]
-                else:
+        # If all items are strings, use as-is (trimmed); the type check and the
+        # trim share one pass and bail out on the first non-string
+        ai_flat = []
+        if isinstance(ai_gen_seg, list):
+            for x in ai_gen_seg:
+                if not isinstance(x, str):
                     # Mixed or hierarchical dicts -> flatten
                     ai_flat = flatten_ai_list(ai_gen_seg)
-            else:
-                ai_flat = []
+                    break
+                ai_flat.append(x.strip())
 
         # Lightweight logging about prepared ai_gen_seg (flat list) for saving
         try:
@@ -1674,19 +2317,10 @@ def save_data_endpoint():
         except Exception:
             app.logger.exception('Error while logging ai_gen_seg metadata')
         
-        # Create saved_data/full_rd_data folder if it doesn't exist
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        saved_data_dir = os.path.join(current_dir, 'saved_data')
-        os.makedirs(saved_data_dir, exist_ok=True)
-
-        full_rd_dir = os.path.join(saved_data_dir, 'full_rd_data')
-        os.makedirs(full_rd_dir, exist_ok=True)
-
         # Generate filename from title (sanitize) — save using only market name (no timestamp)
-        import re
-        safe_title = re.sub(r'[<>:"/\\|?*]', '', title)[:50]  # Limit to 50 chars
+        safe_title = title.translate(UNSAFE_FILENAME_CHARS)[:50]  # Limit to 50 chars
         filename = f"{safe_title}.json"
-        filepath = os.path.join(full_rd_dir, filename)
+        filepath = os.path.join(FULL_RD_DIR, filename)
 
         # If a file with the same market name exists, back it up before overwriting
         try:
@@ -1704,7 +2338,7 @@ def save_data_endpoint():
         # Collect additional KMI (beyond the fixed ones)
         additional_kmi = data.get('additional_kmi', '')
         if isinstance(additional_kmi, list):
-            additional_kmi = ','.join([str(k).strip() for k in additional_kmi if str(k).strip()])
+            additional_kmi = ','.join(filter(None, (str(k).strip() for k in additional_kmi)))
         additional_kmi = str(additional_kmi).strip()
 
         save_data = {
@@ -1720,9 +2354,10 @@ def save_data_endpoint():
             'additional_kmi': additional_kmi
         }
         
-        # Write to JSON file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False)
+        # Write to JSON file: encode to UTF-8 bytes in one go, then a single write
+        payload = orjson.dumps(save_data, option=orjson.OPT_INDENT_2)
+        with open(filepath, 'wb') as f:
+            f.write(payload)
         
         app.logger.info(f'Data saved to {filepath} by user {session.get("username")}')
         # Log ai_gen_seg saved summary
@@ -1737,91 +2372,10 @@ def save_data_endpoint():
         active_seconds = int(active_seconds_raw) if isinstance(active_seconds_raw, (int, float)) and active_seconds_raw > 0 else None
         try:
             db = get_db()
-            existing = db.execute(
-                'SELECT id FROM rd_submissions WHERE market_name = ?', (title,)
-            ).fetchone()
-            if existing:
-                db.execute('''
-                    UPDATE rd_submissions SET
-                        researcher_username = ?,
-                        json_path = ?,
-                        submitted_at = ?,
-                        timestamp = ?,
-                        sector = ?,
-                        industry_group = ?,
-                        industry = ?,
-                        sub_industry = ?,
-                        value_unit = ?,
-                        cagr = ?,
-                        market_size_2024 = ?,
-                        market_size_2025 = ?,
-                        projected_size_2033 = ?,
-                        segments = ?,
-                        ai_gen_seg = ?,
-                        companies = ?,
-                        created_by = ?,
-                        version = ?,
-                        active_seconds = COALESCE(?, active_seconds),
-                        additional_kmi = ?
-                    WHERE market_name = ?
-                ''', (
-                    session.get('username', 'unknown'),
-                    filepath,
-                    now_ist(),
-                    save_data.get('timestamp'),
-                    industry_classification.get('sector'),
-                    industry_classification.get('industryGroup'),
-                    industry_classification.get('industry'),
-                    industry_classification.get('subIndustry'),
-                    market_inputs.get('valueUnit'),
-                    market_inputs.get('cagr2025_2033'),
-                    market_inputs.get('marketSize2024'),
-                    market_inputs.get('marketSize2025'),
-                    market_inputs.get('projectedSize2033'),
-                    json.dumps(segments),
-                    json.dumps(ai_flat),
-                    json.dumps(companies),
-                    save_data.get('createdBy'),
-                    save_data.get('version'),
-                    active_seconds,
-                    additional_kmi,
-                    title
-                ))
-                db.commit()
-                app.logger.info(f'RD submission record UPDATED for {title}')
-            else:
-                db.execute('''
-                    INSERT INTO rd_submissions 
-                    (market_name, researcher_username, json_path, submitted_at, timestamp,
-                     sector, industry_group, industry, sub_industry,
-                     value_unit, cagr, market_size_2024, market_size_2025, projected_size_2033,
-                     segments, ai_gen_seg, companies, created_by, version, active_seconds, additional_kmi)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    title,
-                    session.get('username', 'unknown'),
-                    filepath,
-                    now_ist(),
-                    save_data.get('timestamp'),
-                    industry_classification.get('sector'),
-                    industry_classification.get('industryGroup'),
-                    industry_classification.get('industry'),
-                    industry_classification.get('subIndustry'),
-                    market_inputs.get('valueUnit'),
-                    market_inputs.get('cagr2025_2033'),
-                    market_inputs.get('marketSize2024'),
-                    market_inputs.get('marketSize2025'),
-                    market_inputs.get('projectedSize2033'),
-                    json.dumps(segments),
-                    json.dumps(ai_flat),
-                    json.dumps(companies),
-                    save_data.get('createdBy'),
-                    save_data.get('version'),
-                    active_seconds,
-                    additional_kmi
-                ))
-                db.commit()
-                app.logger.info(f'RD submission record CREATED for {title}')
+            db.execute(SQL_UPSERT_SUBMISSION, build_submission_row(save_data, filepath, active_seconds))
+            record_autosave(db, 'full_rd', title, filepath)
+            db.commit()
+            app.logger.info(f'RD submission record saved for {title}')
         except Exception as e:
             app.logger.exception(f'Failed to insert/update rd_submission record: {e}')
             # Don't fail the whole operation if SQL insert fails
@@ -1834,18 +2388,60 @@ def save_data_endpoint():
         }), 200
 
     except Exception as e:
-        print(f"Error saving data: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Error saving data: {e}')
         return jsonify({'error': f'Failed to save data: {str(e)}'}), 500
 
 
+def list_column_value(value):
+    """(column text, decoded value) for a list or an already JSON-encoded list.
+
+    Each side is produced once: a list is encoded once for the column, a
+    string is decoded once for the count and the saved JSON file.
+    """
+    if isinstance(value, list):
+        return orjson.dumps(value).decode(), value
+    if isinstance(value, str) and value:
+        try:
+            return value, orjson.loads(value)
+        except orjson.JSONDecodeError:
+            pass
+    return value, value
+
+# Fields the edit modal may send, as (request key = rd_submissions column,
+# (column, file) value converter, count column kept in step, section of the
+# saved JSON file (None = top level), key in the JSON file)
+SUBMISSION_EDIT_FIELDS = (
+    ('sector', None, None, 'industryClassification', 'sector'),
+    ('industry_group', None, None, 'industryClassification', 'industryGroup'),
+    ('industry', None, None, 'industryClassification', 'industry'),
+    ('sub_industry', None, None, 'industryClassification', 'subIndustry'),
+    ('value_unit', None, None, 'marketInputs', 'valueUnit'),
+    ('cagr', None, None, 'marketInputs', 'cagr2025_2033'),
+    ('market_size_2024', None, None, 'marketInputs', 'marketSize2024'),
+    ('market_size_2025', None, None, 'marketInputs', 'marketSize2025'),
+    ('projected_size_2033', None, None, 'marketInputs', 'projectedSize2033'),
+    ('segments', list_column_value, 'segment_count', None, 'segments'),
+    ('ai_gen_seg', list_column_value, None, None, 'ai_gen_seg'),
+    ('companies', list_column_value, 'company_count', None, 'companies'),
+    ('additional_kmi', None, None, None, 'additional_kmi'),
+)
+
+@lru_cache(maxsize=64)
+def update_submission_sql(columns):
+    """UPDATE statement for one rd_submissions row setting exactly these columns.
+
+    Returns the row's json_path/market_name where SQLite supports RETURNING.
+    """
+    assignments = ', '.join(f'{col} = ?' for col in columns)
+    returning = ' RETURNING json_path, market_name' if SQLITE_HAS_RETURNING else ''
+    return f'UPDATE rd_submissions SET {assignments} WHERE id = ?{returning}'
+
 @app.route('/api/update-submission', methods=['POST'])
 @login_required()
 def update_submission():
     """Update an existing RD submission from the edit modal"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         submission_id = data.get('id')
         
         if not submission_id:
@@ -1853,60 +2449,35 @@ def update_submission():
         
         db = get_db()
         
-        # Build update query dynamically based on provided fields
-        updates = []
-        params = []
-        
-        field_map = {
-            'sector': 'sector',
-            'industry_group': 'industry_group',
-            'industry': 'industry',
-            'sub_industry': 'sub_industry',
-            'value_unit': 'value_unit',
-            'cagr': 'cagr',
-            'market_size_2024': 'market_size_2024',
-            'market_size_2025': 'market_size_2025',
-            'projected_size_2033': 'projected_size_2033',
-        }
-        
-        for json_key, db_col in field_map.items():
-            if json_key in data:
-                updates.append(f'{db_col} = ?')
-                params.append(data[json_key])
-        
-        # Handle JSON fields
-        if 'segments' in data:
-            updates.append('segments = ?')
-            params.append(json.dumps(data['segments']) if isinstance(data['segments'], list) else data['segments'])
-        
-        if 'ai_gen_seg' in data:
-            updates.append('ai_gen_seg = ?')
-            params.append(json.dumps(data['ai_gen_seg']) if isinstance(data['ai_gen_seg'], list) else data['ai_gen_seg'])
-        
-        if 'companies' in data:
-            updates.append('companies = ?')
-            params.append(json.dumps(data['companies']) if isinstance(data['companies'], list) else data['companies'])
-        
-        if 'additional_kmi' in data:
-            updates.append('additional_kmi = ?')
-            params.append(data['additional_kmi'])
+        # Collect the provided fields as column -> value, in a stable order
+        provided = [field for field in SUBMISSION_EDIT_FIELDS if field[0] in data]
+        values = {}
+        file_values = {}
+        for key, convert, count_column, _, _ in provided:
+            value = data[key]
+            if convert:
+                values[key], value = convert(value)
+            else:
+                values[key] = value
+            file_values[key] = value
+            if count_column:
+                values[count_column] = len(value) if isinstance(value, list) else 0
         
-        if not updates:
+        if not values:
             return jsonify({'error': 'No fields to update'}), 400
         
-        # Add submission_id to params
-        params.append(submission_id)
-        
-        query = f"UPDATE rd_submissions SET {', '.join(updates)} WHERE id = ?"
-        db.execute(query, params)
+        # The UPDATE hands back the row's file location, so there is no follow-up SELECT
+        # (except on SQLite builds without RETURNING)
+        row = db.execute(update_submission_sql(tuple(values)), (*values.values(), submission_id)).fetchone()
+        if not SQLITE_HAS_RETURNING:
+            row = db.execute('SELECT json_path, market_name FROM rd_submissions WHERE id = ?', (submission_id,)).fetchone()
         db.commit()
         
         # Also update the JSON file if it exists
-        row = db.execute('SELECT json_path, market_name FROM rd_submissions WHERE id = ?', (submission_id,)).fetchone()
-        if row and row['json_path'] and os.path.exists(row['json_path']):
+        if row and row['json_path']:
             try:
-                with open(row['json_path'], 'r', encoding='utf-8') as f:
-                    file_data = json.load(f)
+                with open(row['json_path'], 'rb') as f:
+                    file_data = orjson.loads(f.read())
                 
                 # Update file data with new values
                 if 'industryClassification' not in file_data:
@@ -1914,37 +2485,17 @@ def update_submission():
                 if 'marketInputs' not in file_data:
                     file_data['marketInputs'] = {}
                 
-                if 'sector' in data:
-                    file_data['industryClassification']['sector'] = data['sector']
-                if 'industry_group' in data:
-                    file_data['industryClassification']['industryGroup'] = data['industry_group']
-                if 'industry' in data:
-                    file_data['industryClassification']['industry'] = data['industry']
-                if 'sub_industry' in data:
-                    file_data['industryClassification']['subIndustry'] = data['sub_industry']
-                if 'value_unit' in data:
-                    file_data['marketInputs']['valueUnit'] = data['value_unit']
-                if 'cagr' in data:
-                    file_data['marketInputs']['cagr2025_2033'] = data['cagr']
-                if 'market_size_2024' in data:
-                    file_data['marketInputs']['marketSize2024'] = data['market_size_2024']
-                if 'market_size_2025' in data:
-                    file_data['marketInputs']['marketSize2025'] = data['market_size_2025']
-                if 'projected_size_2033' in data:
-                    file_data['marketInputs']['projectedSize2033'] = data['projected_size_2033']
-                if 'segments' in data:
-                    file_data['segments'] = data['segments']
-                if 'ai_gen_seg' in data:
-                    file_data['ai_gen_seg'] = data['ai_gen_seg']
-                if 'companies' in data:
-                    file_data['companies'] = data['companies']
-                if 'additional_kmi' in data:
-                    file_data['additional_kmi'] = data['additional_kmi']
+                for key, _, _, section, file_key in provided:
+                    target = file_data[section] if section else file_data
+                    target[file_key] = file_values[key]
                 
-                with open(row['json_path'], 'w', encoding='utf-8') as f:
-                    json.dump(file_data, f, indent=2, ensure_ascii=False)
+                file_bytes = orjson.dumps(file_data, option=orjson.OPT_INDENT_2)
+                with open(row['json_path'], 'wb') as f:
+                    f.write(file_bytes)
                 
                 app.logger.info(f'JSON file also updated for submission {submission_id}')
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 app.logger.exception(f'Failed to update JSON file: {e}')
         
@@ -1961,24 +2512,19 @@ def update_submission():
 def mark_downloaded():
     """Mark an RD submission as downloaded when user downloads report/excel"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         market_name = (data.get('market_name') or '').strip()
         
         if not market_name:
             return jsonify({'error': 'market_name is required'}), 400
         
         db = get_db()
-        # Update the most recent submission for this market
+        # market_name is unique (idx_rd_market_name), so this is a single indexed row
         db.execute('''
             UPDATE rd_submissions 
             SET downloaded = 1, last_downloaded_at = ?
             WHERE market_name = ?
-            AND id = (
-                SELECT id FROM rd_submissions 
-                WHERE market_name = ? 
-                ORDER BY submitted_at DESC LIMIT 1
-            )
-        ''', (now_ist(), market_name, market_name))
+        ''', (now_ist(), market_name))
         db.commit()
         
         app.logger.info(f'Marked {market_name} as downloaded by {session.get("username")}')
@@ -1999,7 +2545,7 @@ def save_current_segments():
     """
 
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         segments = data.get('segments')
         if not isinstance(segments, list) or len(segments) == 0:
             return jsonify({'error': 'segments (non-empty list) is required'}), 400
@@ -2009,7 +2555,7 @@ def save_current_segments():
         # Accept company_data as string or companies as list, always save as string
         company_data = data.get('company_data', '')
         if not company_data and isinstance(data.get('companies'), list):
-            company_data = '\n'.join([str(c) for c in data.get('companies') if c])
+            company_data = '\n'.join(c if isinstance(c, str) else str(c) for c in data.get('companies') if c)
         company_data = company_data.strip()
         
         # Accept financial data fields (use None to detect if they were provided)
@@ -2025,42 +2571,32 @@ def save_current_segments():
         # Accept additional KMI
         additional_kmi = data.get('additional_kmi', '')
         if isinstance(additional_kmi, list):
-            additional_kmi = ','.join([str(k).strip() for k in additional_kmi if str(k).strip()])
+            additional_kmi = ','.join(filter(None, (str(k).strip() for k in additional_kmi)))
         additional_kmi = str(additional_kmi).strip() if additional_kmi else None
 
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        saved_data_dir = os.path.join(current_dir, 'saved_data')
-        os.makedirs(saved_data_dir, exist_ok=True)
-
-        # Save autosave file into a dedicated short_rd_data folder, saved by market name
-        short_rd_dir = os.path.join(saved_data_dir, 'short_rd_data')
-        os.makedirs(short_rd_dir, exist_ok=True)
-
+        # Save autosave file into the dedicated short_rd_data folder, saved by market name
         # Use market name as filename; fallback to 'latest_segments' if market name missing
-        import re
-        safe_name = re.sub(r'[<>:"/\\|?*]', '', market_name)[:50] if market_name else 'latest_segments'
+        safe_name = market_name.translate(UNSAFE_FILENAME_CHARS)[:50] if market_name else 'latest_segments'
         filename = f"{safe_name}.json"
-        latest_path = os.path.join(short_rd_dir, filename)
+        latest_path = os.path.join(SHORT_RD_DIR, filename)
 
-        # Backup existing short RD file if present
+        # Load existing data if file exists to preserve all fields (a missing
+        # file just raises, no separate exists() stat)
+        existing_data = {}
         try:
-            if os.path.exists(latest_path):
-                bak_path = latest_path + '.bak'
-                if os.path.exists(bak_path):
-                    os.remove(bak_path)
-                os.replace(latest_path, bak_path)
+            with open(latest_path, 'rb') as f:
+                existing_data = orjson.loads(f.read())
+        except Exception:
+            pass
+
+        # Backup existing short RD file if present (write_file_atomic below swaps in a
+        # new file, so the backup keeps the old contents)
+        try:
+            bak_path = backup_file(latest_path)
+            if bak_path:
                 app.logger.info(f"Existing short RD file backed up to {bak_path}")
         except Exception:
             app.logger.exception('Failed to backup existing short RD file')
-
-        # Load existing data if file exists to preserve all fields
-        existing_data = {}
-        if os.path.exists(latest_path):
-            try:
-                with open(latest_path, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            except Exception:
-                pass
         
         # Merge with existing data, updating only provided fields
         # Use provided values if they exist, otherwise fall back to existing data
@@ -2079,39 +2615,79 @@ def save_current_segments():
             'additional_kmi': additional_kmi if additional_kmi else existing_data.get('additional_kmi', '')
         }
         
-        # Try to write with retry logic for Windows file locking issues
-        import time
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                with open(latest_path, 'w', encoding='utf-8') as f:
-                    json.dump(payload, f, indent=2, ensure_ascii=False)
-                break  # Success, exit retry loop
-            except PermissionError as pe:
-                if attempt < max_retries - 1:
-                    app.logger.warning(f"File locked, retrying autosave to {latest_path} (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(0.5)  # Wait 500ms before retry
-                else:
-                    # Final attempt failed, provide helpful error message
-                    error_msg = f"Cannot autosave to {filename} - file may be open in another program. Please close the file."
-                    app.logger.error(error_msg)
-                    return jsonify({'error': error_msg, 'warning': True}), 200  # Return 200 but with warning
+        # Atomic replace: readers never see a half-written file. Windows can still
+        # refuse the replace while another program holds the file open.
+        try:
+            write_file_atomic(latest_path, orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        except PermissionError:
+            error_msg = f"Cannot autosave to {filename} - file may be open in another program. Please close the file."
+            app.logger.error(error_msg)
+            return jsonify({'error': error_msg, 'warning': True}), 200  # Return 200 but with warning
+        db = get_db()
+        record_autosave(db, 'short_rd', market_name, latest_path)
+        db.commit()
 
         app.logger.info(f'Autosaved latest segments to {latest_path}')
         return jsonify({'success': True, 'message': 'Latest segments autosaved', 'file_path': latest_path}), 200
     except Exception as e:
-        print(f"Error autosaving segments: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Error autosaving segments: {e}')
         return jsonify({'error': f'Failed to autosave segments: {str(e)}'}), 500
 
+def load_toc_template():
+    """Parse multi_scraper/toc.docx once (creating a blank one if it is missing)."""
+    if not os.path.exists(TOC_TEMPLATE_PATH):
+        Document().save(TOC_TEMPLATE_PATH)
+    return Document(TOC_TEMPLATE_PATH)
+
+# Parsed TOC template; each request works on a deep copy (much cheaper than
+# re-reading the .docx)
+TOC_TEMPLATE = load_toc_template()
+W_VAL = qn('w:val')
+
+# Fully formatted <w:p> per TOC level (style, numbering, spacing, run font),
+# built lazily and deep-copied for every line instead of rebuilding the same
+# properties element by element
+TOC_PARAGRAPHS = {}
+
+def toc_paragraph_template(level):
+    """Formatted list paragraph for one TOC level, with a placeholder run."""
+    template = TOC_PARAGRAPHS.get(level)
+    if template is None:
+        paragraph = copy.deepcopy(TOC_TEMPLATE).add_paragraph('-')
+        paragraph.style = 'List Paragraph'
+        numbering = paragraph._element.get_or_add_pPr().get_or_add_numPr()
+        num_id = OxmlElement('w:numId')
+        num_id.set(W_VAL, '1')
+        ilvl = OxmlElement('w:ilvl')
+        ilvl.set(W_VAL, str(level))
+        numbering.append(num_id)
+        numbering.append(ilvl)
+        run = paragraph.runs[0]
+        run.font.size = Pt(11)
+        run.font.name = 'Calibri'
+        if level == 0:
+            run.bold = True
+        paragraph.paragraph_format.line_spacing = 1.5
+        template = TOC_PARAGRAPHS[level] = paragraph._element
+    return template
+
+def build_toc_document(toc_content):
+    """Copy of the TOC template with (heading, level) pairs appended as numbered list paragraphs."""
+    toc_doc = copy.deepcopy(TOC_TEMPLATE)
+    body = toc_doc.element.body
+    for heading, level in toc_content:
+        paragraph = copy.deepcopy(toc_paragraph_template(level))
+        paragraph.r_lst[0].text = heading
+        body.insert_element_before(paragraph, 'w:sectPr')
+    return toc_doc
+
 @app.route('/api/generate-toc', methods=['POST'])
 def generate_toc():
     """Generate Table of Contents document using toc.py"""
     try:
         from multi_scraper.toc import build_standard_toc
         
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         
         market_name = (data.get('market_name') or 'Market').strip()
         segments_req = data.get('segments')
@@ -2128,17 +2704,13 @@ def generate_toc():
         # If segments not supplied in request, try falling back to latest saved_data file
         if not isinstance(segments_req, list) or len(segments_req) == 0:
             try:
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                saved_data_dir = os.path.join(current_dir, 'saved_data')
-                if os.path.exists(saved_data_dir):
-                    json_files = glob.glob(os.path.join(saved_data_dir, '*.json'))
-                    if json_files:
-                        saved_json_file = max(json_files, key=os.path.getctime)
-                        with open(saved_json_file, 'r', encoding='utf-8') as f:
-                            saved_data = json.load(f)
-                            saved_segments = saved_data.get('segments')
-                            if isinstance(saved_segments, list) and len(saved_segments) > 0:
-                                segments_req = saved_segments
+                saved_json_file = latest_json_file(SAVED_DATA_DIR)
+                if saved_json_file:
+                    with open(saved_json_file, 'rb') as f:
+                        saved_data = orjson.loads(f.read())
+                        saved_segments = saved_data.get('segments')
+                        if isinstance(saved_segments, list) and len(saved_segments) > 0:
+                            segments_req = saved_segments
             except Exception:
                 pass
 
@@ -2150,40 +2722,10 @@ def generate_toc():
         toc_content = build_standard_toc(market_name, ai_segments_data=segments_req, company_names=company_data, kmi_data=kmi_data)
         
         # Create TOC document
-        from docx.oxml import OxmlElement
-        from docx.oxml.ns import qn
-        from docx.shared import Pt
-        
         toc_temp_file_name = f"TOC_{market_name}_Market_SkyQuest.docx"
         toc_temp_file_path = os.path.join(tempfile.gettempdir(), toc_temp_file_name)
         
-        # Create base document template path
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        doc_path = os.path.join(base_dir, 'multi_scraper', 'toc.docx')
-        
-        if not os.path.exists(doc_path):
-            doc = Document()
-            doc.save(doc_path)
-        
-        toc_doc = Document(doc_path)
-        
-        for heading, level in toc_content:
-            paragraph = toc_doc.add_paragraph(heading)
-            paragraph.style = 'List Paragraph'
-            numbering = paragraph._element.get_or_add_pPr().get_or_add_numPr()
-            numId = OxmlElement('w:numId')
-            numId.set(qn('w:val'), '1')
-            ilvl = OxmlElement('w:ilvl')
-            ilvl.set(qn('w:val'), str(level))
-            numbering.append(numId)
-            numbering.append(ilvl)
-            run = paragraph.runs[0]
-            run.font.size = Pt(11)
-            run.font.name = 'Calibri'
-            if level == 0:
-                run.bold = True 
-            paragraph.paragraph_format.line_spacing = 1.5
-        
+        toc_doc = build_toc_document(toc_content)
         toc_doc.save(toc_temp_file_path)
         
         return jsonify({
@@ -2193,9 +2735,7 @@ def generate_toc():
         }), 200
     
     except Exception as e:
-        print(f"Error generating TOC: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Error generating TOC: {e}')
         return jsonify({'error': f'Failed to generate TOC: {str(e)}'}), 500
 
 @app.route('/api/generate-toc-from-submission', methods=['POST'])
@@ -2204,11 +2744,8 @@ def generate_toc_from_submission():
     """Generate TOC document from a saved RD submission (by submission_id)"""
     try:
         from multi_scraper.toc import build_standard_toc
-        from docx.oxml import OxmlElement
-        from docx.oxml.ns import qn
-        from docx.shared import Pt
 
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         submission_id = data.get('submission_id')
 
         if not submission_id:
@@ -2227,7 +2764,7 @@ def generate_toc_from_submission():
         segments = submission.get('segments', '[]')
         if isinstance(segments, str):
             try:
-                segments = json.loads(segments)
+                segments = orjson.loads(segments)
             except Exception:
                 segments = []
 
@@ -2238,7 +2775,7 @@ def generate_toc_from_submission():
         companies = submission.get('companies', '[]')
         if isinstance(companies, str):
             try:
-                companies = json.loads(companies)
+                companies = orjson.loads(companies)
             except Exception:
                 companies = []
         company_data = '\n'.join(companies) if isinstance(companies, list) else str(companies)
@@ -2265,32 +2802,7 @@ def generate_toc_from_submission():
         toc_temp_file_name = f"TOC_{market_name}_Market_SkyQuest.docx"
         toc_temp_file_path = os.path.join(tempfile.gettempdir(), toc_temp_file_name)
 
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        doc_path = os.path.join(base_dir, 'multi_scraper', 'toc.docx')
-
-        if not os.path.exists(doc_path):
-            toc_doc = Document()
-            toc_doc.save(doc_path)
-
-        toc_doc = Document(doc_path)
-
-        for heading, level in toc_content:
-            paragraph = toc_doc.add_paragraph(heading)
-            paragraph.style = 'List Paragraph'
-            numbering = paragraph._element.get_or_add_pPr().get_or_add_numPr()
-            numId = OxmlElement('w:numId')
-            numId.set(qn('w:val'), '1')
-            ilvl = OxmlElement('w:ilvl')
-            ilvl.set(qn('w:val'), str(level))
-            numbering.append(numId)
-            numbering.append(ilvl)
-            run = paragraph.runs[0]
-            run.font.size = Pt(11)
-            run.font.name = 'Calibri'
-            if level == 0:
-                run.bold = True
-            paragraph.paragraph_format.line_spacing = 1.5
-
+        toc_doc = build_toc_document(toc_content)
         toc_doc.save(toc_temp_file_path)
 
         return jsonify({
@@ -2300,16 +2812,15 @@ def generate_toc_from_submission():
         }), 200
 
     except Exception as e:
-        print(f"Error generating TOC from submission: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Error generating TOC from submission: {e}')
         return jsonify({'error': f'Failed to generate TOC: {str(e)}'}), 500
 
 @app.route('/api/generate-short-rd', methods=['POST'])
+@login_required(role=('researcher','admin'))
 def generate_short_rd():
     """Generate Short Research Document using segments from request body only"""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         
         market_name = (data.get('market_name') or 'Market').strip()
         headings = data.get('headings', [])
@@ -2320,7 +2831,7 @@ def generate_short_rd():
         # Accept company_data as string or companies as list, always save as string
         company_data = data.get('company_data', '')
         if not company_data and isinstance(data.get('companies'), list):
-            company_data = '\n'.join([str(c) for c in data.get('companies') if c])
+            company_data = '\n'.join(c if isinstance(c, str) else str(c) for c in data.get('companies') if c)
         company_data = company_data.strip()
         # Accept both value_2023 and value_2024 for compatibility
         value_2024 = float(data.get('value_2024') or data.get('value_2023', 0))
@@ -2354,34 +2865,47 @@ def generate_short_rd():
             return jsonify({'error': error_message}), 400
         
         # --- Save all frontend data to short_rd_data JSON (before generating doc) ---
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        saved_data_dir = os.path.join(current_dir, 'saved_data')
-        short_rd_dir = os.path.join(saved_data_dir, 'short_rd_data')
-        os.makedirs(short_rd_dir, exist_ok=True)
-        import re
-        safe_name = re.sub(r'[<>:"/\\|?*]', '', market_name)[:50] if market_name else 'short_rd'
+        safe_name = market_name.translate(UNSAFE_FILENAME_CHARS)[:50] if market_name else 'short_rd'
         json_filename = f"{safe_name}.json"
-        json_path = os.path.join(short_rd_dir, json_filename)
+        json_path = os.path.join(SHORT_RD_DIR, json_filename)
         # Compose full frontend data for JSON
         # Load existing data if file exists to preserve all fields
         existing_data = {}
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            except Exception:
-                pass
+        try:
+            with open(json_path, 'rb') as f:
+                existing_data = orjson.loads(f.read())
+        except Exception:
+            pass
         
         # Merge with existing data, updating only provided fields
         # Collect additional KMI
         additional_kmi = data.get('additional_kmi', '')
         if isinstance(additional_kmi, list):
-            additional_kmi = ','.join([str(k).strip() for k in additional_kmi if str(k).strip()])
+            additional_kmi = ','.join(filter(None, (str(k).strip() for k in additional_kmi)))
         additional_kmi = str(additional_kmi).strip()
 
+        # Resolve the final segments before writing, so the file is written once
+        # and nothing is read back afterwards. Segments sent in the request are
+        # authoritative, and an explicit empty list clears the saved ones. Without
+        # them this market's previously saved segments are used; the latest full
+        # save (possibly another market's) is a fallback for the document alone.
+        clear_segments = 'segments' in data and segments_req == []
+        if 'segments' in data:
+            saved_segments = segments_req
+        else:
+            saved_segments = existing_data.get('segments', [])
+            if isinstance(saved_segments, list) and len(saved_segments) > 0:
+                segments_req = saved_segments
+            else:
+                segments_req = load_autosaved_segments((latest_autosave_path('full_rd'),))
+
+        # segments (final view segments) are mandatory and authoritative
+        if not isinstance(segments_req, list) or (len(segments_req) == 0 and not clear_segments):
+            return jsonify({'error': 'segments is required and must be a non-empty list (provide in request or save segments first)'}), 400
+
         short_rd_payload = {
             "market_name": market_name,
-            "segments": data.get('segments', existing_data.get('segments', [])),
+            "segments": saved_segments,
             "ai_gen_seg": data.get('ai_gen_seg', existing_data.get('ai_gen_seg', [])),
             "timestamp": data.get('timestamp', now_ist()),
             "savedBy": session.get('username', 'unknown'),
@@ -2394,97 +2918,38 @@ def generate_short_rd():
             "additional_kmi": additional_kmi if additional_kmi else existing_data.get('additional_kmi', '')
         }
         
-        # Try to write with retry logic for Windows file locking issues
-        import time
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(short_rd_payload, f, indent=2, ensure_ascii=False)
-                break  # Success, exit retry loop
-            except PermissionError as pe:
-                if attempt < max_retries - 1:
-                    app.logger.warning(f"File locked, retrying write to {json_path} (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(0.5)  # Wait 500ms before retry
-                else:
-                    # Final attempt failed, provide helpful error message
-                    error_msg = f"Cannot write to {json_filename} - file may be open in another program (text editor, Excel, etc.). Please close the file and try again."
-                    app.logger.error(error_msg)
-                    return jsonify({'error': error_msg}), 500
+        # Atomic replace: readers never see a half-written file. Windows can still
+        # refuse the replace while another program holds the file open.
+        try:
+            write_file_atomic(json_path, orjson.dumps(short_rd_payload, option=orjson.OPT_INDENT_2))
+        except PermissionError:
+            error_msg = f"Cannot write to {json_filename} - file may be open in another program (text editor, Excel, etc.). Please close the file and try again."
+            app.logger.error(error_msg)
+            return jsonify({'error': error_msg}), 500
+        db = get_db()
+        record_autosave(db, 'short_rd', market_name, json_path)
+        db.commit()
+
+        if clear_segments:
+            return jsonify({'error': 'Segments cleared; add segments to generate the Short RD', 'short_rd_json': json_path}), 400
 
-        # Build segment data for export_to_word using request body only
+        # Build segment data for export_to_word from the resolved segments
         toc_entries = []
         segments = []
-        
-        def extract_level_from_segment(segment_text):
-            """Extract hierarchy level from segment numbering"""
-            import re
-            match = re.match(r'^(\d+(?:\.\d+)*)', segment_text)
-            if match:
-                numbers = match.group(1).split('.')
-                return len(numbers) - 1  # 0-based level
-            return 0
-        
-        def clean_segment_text(segment_text):
-            """Remove numbering from segment text"""
-            import re
-            return re.sub(r'^\d+(?:\.\d+)*\.\s*', '', segment_text)
-        
-        # If segments not supplied in request, first check autosaved 'latest_segments.json', then full saved files
-        if not isinstance(segments_req, list) or len(segments_req) == 0:
-            try:
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                saved_data_dir = os.path.join(current_dir, 'saved_data')
-                if os.path.exists(saved_data_dir):
-                    # Check for autosaved short RD files (saved by market name) and pick most recent
-                    short_rd_dir = os.path.join(saved_data_dir, 'short_rd_data')
-                    latest_path_legacy = os.path.join(saved_data_dir, 'latest_segments.json')
-                    if os.path.exists(short_rd_dir):
-                        short_files = glob.glob(os.path.join(short_rd_dir, '*.json'))
-                        if short_files:
-                            latest_short = max(short_files, key=os.path.getctime)
-                            try:
-                                with open(latest_short, 'r', encoding='utf-8') as f:
-                                    latest = json.load(f)
-                                    latest_segments = latest.get('segments')
-                                    if isinstance(latest_segments, list) and len(latest_segments) > 0:
-                                        segments_req = latest_segments
-                            except Exception:
-                                app.logger.exception(f'Failed to read short RD autosave file: {latest_short}')
-                    elif os.path.exists(latest_path_legacy):
-                        with open(latest_path_legacy, 'r', encoding='utf-8') as f:
-                            latest = json.load(f)
-                            latest_segments = latest.get('segments')
-                            if isinstance(latest_segments, list) and len(latest_segments) > 0:
-                                segments_req = latest_segments
-                    # Fallback to most recent saved JSON file (include full_rd_data folder)
-                    if not (isinstance(segments_req, list) and len(segments_req) > 0):
-                        full_rd_dir = os.path.join(saved_data_dir, 'full_rd_data')
-                        json_files = []
-                        if os.path.exists(full_rd_dir):
-                            json_files.extend(glob.glob(os.path.join(full_rd_dir, '*.json')))
-                        json_files.extend(glob.glob(os.path.join(saved_data_dir, '*.json')))
-                        if json_files:
-                            saved_json_file = max(json_files, key=os.path.getctime)
-                            with open(saved_json_file, 'r', encoding='utf-8') as f:
-                                saved_data = json.load(f)
-                                saved_segments = saved_data.get('segments')
-                                if isinstance(saved_segments, list) and len(saved_segments) > 0:
-                                    segments_req = saved_segments
-            except Exception:
-                pass
-
-        # segments (final view segments) are mandatory and authoritative
-        if not isinstance(segments_req, list) or len(segments_req) == 0:
-            return jsonify({'error': 'segments is required and must be a non-empty list (provide in request or save segments first)'}), 400
 
         # Build toc_entries from segments (trust UI strings exactly but parse level)
         for segment in segments_req:
             s = str(segment).strip()
             if not s:
                 continue
-            level = extract_level_from_segment(s)
-            clean_text = clean_segment_text(s)
+            # One match gives both the 0-based level and the text after the number
+            m = SEGMENT_NUMBER_RE.match(s)
+            if m:
+                level = m.group('num').count('.')
+                clean_text = s[m.end():] if m.group('dot') else s
+            else:
+                level = 0
+                clean_text = s
             if level == 0:
                 toc_heading = f"Global {market_name} Size by {clean_text} & CAGR (2026-2033)"
                 toc_entries.append((toc_heading, level))
@@ -2500,7 +2965,10 @@ def generate_short_rd():
         rd_temp_file_path = os.path.join(tempfile.gettempdir(), rd_temp_file_name)
         
         word_toc_entries = [(t, l) for t, l in toc_entries if l <= 2]
-        export_to_word(
+        # Build the document in the DOCX worker pool; the client polls
+        # /api/job-status/<job_id> and then downloads file_path
+        future = submit_docx_task(
+            export_to_word,
             data=word_toc_entries,
             market_name=market_name,
             value_2024=value_2024,
@@ -2509,18 +2977,22 @@ def generate_short_rd():
             companies=company_data,
             output_path=rd_temp_file_path
         )
+        job_id = start_job(future, lambda output_path: ({
+            'success': True,
+            'file_path': output_path,
+            'filename': rd_temp_file_name,
+            'short_rd_json': json_path
+        }, 200), error_prefix='Failed to generate Short RD')
         
         return jsonify({
             'success': True,
-            'file_path': rd_temp_file_path,
+            'job_id': job_id,
             'filename': rd_temp_file_name,
             'short_rd_json': json_path
-        }), 200
+        }), 202
     
     except Exception as e:
-        print(f"Error generating Short RD: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'Error generating Short RD: {e}')
         return jsonify({'error': f'Failed to generate Short RD: {str(e)}'}), 500
 
 @app.route('/api/download-file')
@@ -2535,10 +3007,9 @@ def download_file():
         # Prevent path traversal attacks - normalize and validate path
         file_path = os.path.abspath(file_path)
         temp_dir = os.path.abspath(tempfile.gettempdir())
-        current_dir = os.path.abspath(os.path.dirname(__file__))
         
-        # Only allow files from temp directory or current directory tree
-        if not (file_path.startswith(temp_dir) or file_path.startswith(current_dir)):
+        # Only allow files from temp directory or the app directory tree
+        if not (file_path.startswith(temp_dir) or file_path.startswith(APP_DIR)):
             app.logger.warning(f'Path traversal attempt blocked: {file_path}')
             return "Error: Invalid file path.", 403
         
@@ -2557,102 +3028,311 @@ def download_file():
     except Exception as e:
         return f"Error downloading file: {str(e)}", 500
 
+SKYQUEST_LOGIN_URL = 'https://www.skyquestt.com/api/login'
+SKYQUEST_UPLOAD_URL = 'https://www.skyquestt.com/api/importRDFile'
+# Credentials are fixed for the life of the process; read them once
+SKYQUEST_EMAIL = os.getenv('SKYQUEST_EMAIL')
+SKYQUEST_PASSWORD = os.getenv('SKYQUEST_PASSWORD')
+if not (SKYQUEST_EMAIL and SKYQUEST_PASSWORD):
+    app.logger.warning('SKYQUEST_EMAIL/SKYQUEST_PASSWORD not set! Submitting to SkyQuest will fail until they are set in .env.')
+# Log in again this many seconds before the cached token's expires_in runs out
+SKYQUEST_TOKEN_REFRESH_MARGIN = 60
+
+# Submission progress goes through app.logger's queue; the per-field dumps are
+# DEBUG and, like all %-style arguments, only formatted when enabled. The level
+# follows app.logger unless SKYQUEST_LOG_LEVEL (e.g. INFO, DEBUG) is set in .env.
+skyquest_log = app.logger.getChild('skyquest')
+if os.getenv('SKYQUEST_LOG_LEVEL'):
+    skyquest_log.setLevel(os.getenv('SKYQUEST_LOG_LEVEL').strip().upper())
+
+# requests-toolbelt is optional: with it the upload streams the files from
+# disk, without it requests builds the whole multipart body in memory
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+_skyquest_session = None
+_skyquest_session_lock = threading.Lock()
+# (email, token, monotonic expiry) of the last successful login
+_skyquest_token = (None, None, 0.0)
+_skyquest_token_lock = threading.Lock()
+
+def skyquest_session():
+    """Shared requests.Session so SkyQuest logins and uploads reuse TCP/TLS connections."""
+    global _skyquest_session
+    with _skyquest_session_lock:
+        if _skyquest_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session_ = requests.Session()
+            session_.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+            _skyquest_session = session_
+        return _skyquest_session
+
+def get_skyquest_token(email, password):
+    """Bearer token for the SkyQuest API, logging in only when no valid one is cached.
+
+    Returns (token, None) or (None, error message).
+    """
+    global _skyquest_token
+    with _skyquest_token_lock:
+        cached_email, token, expires_at = _skyquest_token
+        if token and cached_email == email and time.monotonic() < expires_at:
+            return token, None
+        
+        login_response = skyquest_session().post(SKYQUEST_LOGIN_URL, data={
+            'email': email,
+            'password': password
+        }, timeout=60)
+        
+        if login_response.status_code != 200:
+            return None, f'Failed to get SkyQuest token: {login_response.text}'
+        
+        token_data = login_response.json()
+        token = token_data.get('token')
+        
+        if not token:
+            return None, 'No token received from SkyQuest'
+        
+        skyquest_log.info('[SkyQuest] Token received, expires: %s', token_data.get("expires_in"))
+        try:
+            lifetime = float(token_data.get('expires_in'))
+        except (TypeError, ValueError):
+            lifetime = 0  # Unknown lifetime: never reuse the token
+        _skyquest_token = (email, token, time.monotonic() + lifetime - SKYQUEST_TOKEN_REFRESH_MARGIN)
+        return token, None
+
+def forget_skyquest_token():
+    """Drop the cached token (e.g. after SkyQuest rejected it)."""
+    global _skyquest_token
+    with _skyquest_token_lock:
+        _skyquest_token = (None, None, 0.0)
+
 @app.route('/api/submit-to-skyquest', methods=['POST'])
 @login_required(role='admin')
 def submit_to_skyquest():
     """Submit report to SkyQuest website API - Admin only
+
+    The submission takes ~15 minutes, so it runs as a background job; the
+    response carries a job_id to poll at /api/job-status/<job_id>.
+    """
+    data = request.get_json(silent=True) or {}
+    submission_id = data.get('submission_id')
+    
+    if not submission_id:
+        return jsonify({'error': 'submission_id is required'}), 400
+    
+    # Get submission from database
+    row = get_db().execute('SELECT * FROM rd_submissions WHERE id = ?', (submission_id,)).fetchone()
+    
+    if not row:
+        return jsonify({'error': 'Submission not found'}), 404
+    
+    future = background_jobs.submit(run_view_in_app_context, run_skyquest_submission, submission_id, dict(row))
+    job_id = start_job(future, lambda result: result, error_prefix='Failed to submit to SkyQuest')
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
+# Image generation retries: exponential backoff with jitter, capped
+IMAGE_GEN_MAX_ATTEMPTS = 10
+IMAGE_GEN_BACKOFF_CAP_SECONDS = 60
+
+def is_retriable_api_error(e):
+    """False for API errors a retry cannot fix: 4xx other than timeout/rate limit.
+
+    Reads the status from google-genai's APIError.code or openai's
+    APIStatusError.status_code; anything without one is retried.
+    """
+    status = getattr(e, 'code', None)
+    if not isinstance(status, int):
+        status = getattr(e, 'status_code', None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+# Written into the submission folder once its DOCX, image and Excel exist;
+# the leading dot keeps it out of files_by_extension
+SKYQUEST_MANIFEST_NAME = '.manifest.json'
+
+def load_skyquest_manifest(submission_folder):
+    """Artifacts recorded by an earlier SkyQuest run, shaped like files_by_extension.
+
+    Returns None when there is no manifest or a recorded file is missing, so
+    the caller falls back to scanning the folder (and regenerating).
+    """
+    try:
+        with open(os.path.join(submission_folder, SKYQUEST_MANIFEST_NAME), 'rb') as f:
+            manifest = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict):
+        return None
+    found = {}
+    for key in ('doc', 'image', 'excel'):
+        path = manifest.get(key)
+        if not (isinstance(path, str) and os.path.isfile(path)):
+            return None
+        found[os.path.splitext(path)[1].lower()] = [path]
+    return found
+
+def ensure_skyquest_image(market_name, submission_folder, existing_files):
+    """Step 3 of a SkyQuest submission: reuse or generate the market image.
+
+    Returns the image path, or None to continue without an image.
     """
-    import requests
     import shutil
     
+    skyquest_log.info('[SkyQuest] Step 3/5: Checking for existing image or generating new...')
+    
+    # Check for existing image
+    existing_images = existing_files.get('.webp') or existing_files.get('.png') or existing_files.get('.jpg')
+    
+    image_path = None
+    if existing_images:
+        image_path = existing_images[0]
+        skyquest_log.info('[SkyQuest] Using existing image: %s', image_path)
+    elif generate_market_image is None:
+        # Retrying cannot help when the image_gen dependencies are missing
+        skyquest_log.warning('[SkyQuest] Image generation unavailable (%s), continuing without image...', IMAGE_GEN_IMPORT_ERROR)
+    else:
+        # Up to IMAGE_GEN_MAX_ATTEMPTS tries with exponential backoff between them
+        max_retries = IMAGE_GEN_MAX_ATTEMPTS
+        for attempt in range(1, max_retries + 1):
+            skyquest_log.info('[SkyQuest] Image generation attempt %s/%s...', attempt, max_retries)
+            try:
+                image_output = generate_market_image(market_name)
+                image_dest = os.path.join(submission_folder, os.path.basename(image_output))
+                try:
+                    # Same-filesystem rename; fall back to copy+unlink across devices
+                    os.replace(image_output, image_dest)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    shutil.move(image_output, image_dest)
+                image_path = image_dest
+                skyquest_log.info('[SkyQuest] Image saved: %s', image_path)
+                break
+            except Exception as e:
+                skyquest_log.warning('[SkyQuest] Image attempt %s failed: %s', attempt, e)
+                if not is_retriable_api_error(e):
+                    skyquest_log.warning('[SkyQuest] Image error is not retriable, continuing without image...')
+                    image_path = None
+                    break
+                if attempt < max_retries:
+                    delay = min(IMAGE_GEN_BACKOFF_CAP_SECONDS, 2 ** attempt + random.uniform(0, 1))
+                    skyquest_log.info('[SkyQuest] Waiting %.1f seconds before retry...', delay)
+                    time.sleep(delay)
+                else:
+                    skyquest_log.warning('[SkyQuest] All image attempts failed, continuing without image...')
+                    image_path = None
+    
+    return image_path
+
+def ensure_skyquest_excel(market_name, submission_folder, existing_files):
+    """Step 4 of a SkyQuest submission: reuse or generate the mandatory Excel.
+
+    Returns (excel_path, None), or (None, error message) when it cannot be made.
+    """
+    skyquest_log.info('[SkyQuest] Step 4/5: Checking for existing Excel or generating new...')
+    
+    # Check for existing Excel
+    existing_excel = existing_files.get('.xlsx')
+    
+    excel_path = None
+    if existing_excel:
+        excel_path = existing_excel[0]
+        skyquest_log.info('[SkyQuest] Using existing Excel: %s', excel_path)
+    else:
+        try:
+            # Try to find matching JSON in dominating_region folder
+            matching_json = None
+            
+            index = dominating_region_index()
+            if index is not None:
+                # Name match, then ' market'-less prefix, then first 30 chars
+                matching_json = find_dominating_region_json(index, market_name, prefix_fallbacks=True)
+                if matching_json:
+                    skyquest_log.info('[SkyQuest] Matched dominating_region data: %s', os.path.basename(matching_json))
+            
+            if matching_json:
+                # Generate Excel from dominating_region data
+                wb, extracted_name = generate_excel(matching_json)
+                excel_path = os.path.join(submission_folder, f'{clean_filename(extracted_name or market_name)}.xlsx')
+                wb.save(excel_path)
+                skyquest_log.info('[SkyQuest] Excel generated from data: %s', excel_path)
+            else:
+                # No dominating_region data available - FAIL (Excel is mandatory)
+                error_msg = f'Excel generation failed: No dominating_region data found for "{market_name}". Excel file is mandatory for SkyQuest submission.'
+                skyquest_log.error('[SkyQuest] %s', error_msg)
+                return None, error_msg
+                
+        except Exception as e:
+            # Excel generation error - FAIL (Excel is mandatory)
+            error_msg = f'Excel generation failed: {str(e)}. Excel file is mandatory for SkyQuest submission.'
+            app.logger.exception(f'[SkyQuest] {error_msg}')
+            return None, error_msg
+    
+    return excel_path, None
+
+def run_skyquest_submission(submission_id, submission):
+    """Generate the DOCX, image and Excel for a submission and upload them to SkyQuest.
+
+    Runs on a background_jobs thread; returns a view-style (response, status).
+    """
     try:
-        data = request.json or {}
-        submission_id = data.get('submission_id')
-        
-        if not submission_id:
-            return jsonify({'error': 'submission_id is required'}), 400
-        
-        # Get submission from database
         db = get_db()
-        cur = db.execute('SELECT * FROM rd_submissions WHERE id = ?', (submission_id,))
-        row = cur.fetchone()
-        
-        if not row:
-            return jsonify({'error': 'Submission not found'}), 404
-        
-        submission = dict(row)
         market_name = submission.get('market_name', 'Unknown')
         
         # Create website_submission folder
-        current_dir = os.path.dirname(os.path.abspath(__file__))
         safe_market_name = market_name.replace(' ', '_').replace('/', '-')
-        submission_folder = os.path.join(current_dir, 'website_submission', safe_market_name)
+        submission_folder = os.path.join(APP_DIR, 'website_submission', safe_market_name)
         os.makedirs(submission_folder, exist_ok=True)
         
-        print(f'[SkyQuest] Starting submission for: {market_name}')
-        print(f'[SkyQuest] Output folder: {submission_folder}')
+        skyquest_log.info('[SkyQuest] Starting submission for: %s', market_name)
+        skyquest_log.info('[SkyQuest] Output folder: %s', submission_folder)
         
-        # Step 1: Get SkyQuest token
-        print('[SkyQuest] Step 1/5: Getting auth token...')
-        login_url = 'https://www.skyquestt.com/api/login'
+        # Step 1: Get SkyQuest token (checks the credentials before the slow steps)
+        skyquest_log.info('[SkyQuest] Step 1/5: Getting auth token...')
         
-        # Get credentials from environment variables
-        skyquest_email = os.getenv('SKYQUEST_EMAIL')
-        skyquest_password = os.getenv('SKYQUEST_PASSWORD')
-        
-        if not skyquest_email or not skyquest_password:
+        if not (SKYQUEST_EMAIL and SKYQUEST_PASSWORD):
             return jsonify({'error': 'SkyQuest credentials not configured. Set SKYQUEST_EMAIL and SKYQUEST_PASSWORD environment variables.'}), 500
         
-        login_response = requests.post(login_url, data={
-            'email': skyquest_email,
-            'password': skyquest_password
-        }, timeout=60)
-        
-        if login_response.status_code != 200:
-            return jsonify({'error': f'Failed to get SkyQuest token: {login_response.text}'}), 500
-        
-        token_data = login_response.json()
-        token = token_data.get('token')
-        
-        if not token:
-            return jsonify({'error': 'No token received from SkyQuest'}), 500
-        
-        print(f'[SkyQuest] Token received, expires: {token_data.get("expires_in")}')
+        token, token_error = get_skyquest_token(SKYQUEST_EMAIL, SKYQUEST_PASSWORD)
+        if token_error:
+            return jsonify({'error': token_error}), 500
         
         # Step 2: Generate DOCX report (takes ~10 minutes)
-        print('[SkyQuest] Step 2/5: Generating DOCX report (this may take 10+ minutes)...')
+        skyquest_log.info('[SkyQuest] Step 2/5: Generating DOCX report (this may take 10+ minutes)...')
         
         segments = submission.get('segments', [])
         if isinstance(segments, str):
             try:
-                segments = json.loads(segments)
+                segments = orjson.loads(segments)
             except:
                 segments = []
         
         ai_gen_seg = submission.get('ai_gen_seg', [])
         if isinstance(ai_gen_seg, str):
             try:
-                ai_gen_seg = json.loads(ai_gen_seg)
+                ai_gen_seg = orjson.loads(ai_gen_seg)
             except:
                 ai_gen_seg = []
         
         companies = submission.get('companies', [])
         if isinstance(companies, str):
             try:
-                companies = json.loads(companies)
+                companies = orjson.loads(companies)
             except:
                 companies = []
         
         # Debug: Print all submission data
-        print(f'[SkyQuest] Submission data:')
-        print(f'[SkyQuest]   - sector: {submission.get("sector")}')
-        print(f'[SkyQuest]   - industry_group: {submission.get("industry_group")}')
-        print(f'[SkyQuest]   - industry: {submission.get("industry")}')
-        print(f'[SkyQuest]   - sub_industry: {submission.get("sub_industry")}')
-        print(f'[SkyQuest]   - cagr: {submission.get("cagr")}')
-        print(f'[SkyQuest]   - value_unit: {submission.get("value_unit")}')
-        print(f'[SkyQuest]   - segments count: {len(segments)}')
-        print(f'[SkyQuest]   - companies count: {len(companies)}')
+        skyquest_log.debug('[SkyQuest] Submission data:')
+        skyquest_log.debug('[SkyQuest]   - sector: %s', submission.get("sector"))
+        skyquest_log.debug('[SkyQuest]   - industry_group: %s', submission.get("industry_group"))
+        skyquest_log.debug('[SkyQuest]   - industry: %s', submission.get("industry"))
+        skyquest_log.debug('[SkyQuest]   - sub_industry: %s', submission.get("sub_industry"))
+        skyquest_log.debug('[SkyQuest]   - cagr: %s', submission.get("cagr"))
+        skyquest_log.debug('[SkyQuest]   - value_unit: %s', submission.get("value_unit"))
+        skyquest_log.debug('[SkyQuest]   - segments count: %s', len(segments))
+        skyquest_log.debug('[SkyQuest]   - companies count: %s', len(companies))
         
         # Build report data with all required fields
         report_data = {
@@ -2674,157 +3354,66 @@ def submit_to_skyquest():
             }
         }
         
-        # Check for existing DOCX in submission folder
-        import time
-        import glob as glob_module
+        # Outputs left by an earlier attempt: the manifest when it is complete,
+        # else one scan of the submission folder
+        existing_files = load_skyquest_manifest(submission_folder)
+        if existing_files is None:
+            existing_files = files_by_extension(submission_folder)
+        else:
+            skyquest_log.info('[SkyQuest] Reusing artifacts from %s', SKYQUEST_MANIFEST_NAME)
         
-        existing_docx = glob_module.glob(os.path.join(submission_folder, '*.docx'))
+        # Check for existing DOCX in submission folder; otherwise it is built in
+        # the DOCX worker pool while the image and Excel steps run
+        doc_future = None
+        existing_docx = existing_files.get('.docx')
         if existing_docx:
             doc_path = existing_docx[0]
-            print(f'[SkyQuest] Using existing DOCX: {doc_path}')
+            skyquest_log.info('[SkyQuest] Using existing DOCX: %s', doc_path)
         else:
-            doc = Document()
-            generate_docx_from_data(report_data, doc=doc)
+            doc_future = submit_docx_task(render_report_docx, report_data)
+        
+        # Steps 3 and 4 are independent (image API vs. dominating_region data),
+        # so they overlap each other and the DOCX build
+        with ThreadPoolExecutor(max_workers=2) as side_steps:
+            image_future = side_steps.submit(ensure_skyquest_image, market_name, submission_folder, existing_files)
+            excel_future = side_steps.submit(ensure_skyquest_excel, market_name, submission_folder, existing_files)
+            image_path = image_future.result()
+            excel_path, excel_error = excel_future.result()
+        
+        # Save the DOCX even when the Excel failed, so a retry can reuse it
+        if doc_future is not None:
+            doc_bytes = doc_future.result()
             doc_path = os.path.join(submission_folder, f'{safe_market_name}.docx')
-            doc.save(doc_path)
-            print(f'[SkyQuest] DOCX saved: {doc_path}')
-        
-        # Step 3: Generate Image (takes ~1-2 minutes) with retry
-        print('[SkyQuest] Step 3/5: Checking for existing image or generating new...')
-        
-        # Check for existing image
-        existing_images = glob_module.glob(os.path.join(submission_folder, '*.webp'))
-        if not existing_images:
-            existing_images = glob_module.glob(os.path.join(submission_folder, '*.png'))
-        if not existing_images:
-            existing_images = glob_module.glob(os.path.join(submission_folder, '*.jpg'))
-        
-        image_path = None
-        if existing_images:
-            image_path = existing_images[0]
-            print(f'[SkyQuest] Using existing image: {image_path}')
-        else:
-            # Try up to 10 times with 30 sec delay
-            max_retries = 10
-            for attempt in range(1, max_retries + 1):
-                print(f'[SkyQuest] Image generation attempt {attempt}/{max_retries}...')
-                try:
-                    from image_gen import generate_market_image
-                    image_output = generate_market_image(market_name)
-                    image_dest = os.path.join(submission_folder, os.path.basename(image_output))
-                    if os.path.exists(image_output):
-                        shutil.move(image_output, image_dest)
-                    image_path = image_dest
-                    print(f'[SkyQuest] Image saved: {image_path}')
-                    break
-                except Exception as e:
-                    print(f'[SkyQuest] Image attempt {attempt} failed: {e}')
-                    if attempt < max_retries:
-                        print(f'[SkyQuest] Waiting 30 seconds before retry...')
-                        time.sleep(30)
-                    else:
-                        print('[SkyQuest] All image attempts failed, continuing without image...')
-                        image_path = None
-        
-        # Step 4: Generate Excel if data exists (takes ~2 minutes)
-        print('[SkyQuest] Step 4/5: Checking for existing Excel or generating new...')
+            with open(doc_path, 'wb') as f:
+                f.write(doc_bytes)
+            skyquest_log.info('[SkyQuest] DOCX saved: %s', doc_path)
         
-        # Check for existing Excel
-        existing_excel = glob_module.glob(os.path.join(submission_folder, '*.xlsx'))
+        if excel_error:
+            return jsonify({'error': excel_error}), 400
         
-        excel_path = None
-        if existing_excel:
-            excel_path = existing_excel[0]
-            print(f'[SkyQuest] Using existing Excel: {excel_path}')
-        else:
-            try:
-                import sys
-                multi_scraper_dir = os.path.join(current_dir, 'multi_scraper')
-                if multi_scraper_dir not in sys.path:
-                    sys.path.insert(0, multi_scraper_dir)
-                from excel_gen import generate_excel, clean_filename
-                
-                # Try to find matching JSON in dominating_region folder
-                dominating_region_dir = os.path.join(current_dir, 'dominating_region')
-                matching_json = None
-                
-                if os.path.exists(dominating_region_dir):
-                    json_files = [f for f in os.listdir(dominating_region_dir) if f.endswith('.json')]
-                    
-                    # Try multiple matching strategies
-                    # 1. Exact match (case insensitive)
-                    for jf in json_files:
-                        if market_name.lower() in jf.lower():
-                            matching_json = os.path.join(dominating_region_dir, jf)
-                            break
-                    
-                    # 2. If no match, try removing " Market" suffix and match beginning
-                    if not matching_json:
-                        market_name_base = market_name.lower().replace(' market', '').strip()
-                        for jf in json_files:
-                            jf_lower = jf.lower()
-                            # Check if filename starts with the market name base
-                            if jf_lower.startswith(market_name_base):
-                                matching_json = os.path.join(dominating_region_dir, jf)
-                                print(f'[SkyQuest] Matched by prefix: {jf}')
-                                break
-                    
-                    # 3. If still no match, try fuzzy match (first 30 chars)
-                    if not matching_json and len(market_name) > 30:
-                        market_prefix = market_name.lower()[:30]
-                        for jf in json_files:
-                            if market_prefix in jf.lower():
-                                matching_json = os.path.join(dominating_region_dir, jf)
-                                print(f'[SkyQuest] Matched by fuzzy prefix: {jf}')
-                                break
-                
-                if matching_json:
-                    # Generate Excel from dominating_region data
-                    wb, extracted_name = generate_excel(matching_json)
-                    excel_path = os.path.join(submission_folder, f'{clean_filename(extracted_name or market_name)}.xlsx')
-                    wb.save(excel_path)
-                    print(f'[SkyQuest] Excel generated from data: {excel_path}')
-                else:
-                    # No dominating_region data available - FAIL (Excel is mandatory)
-                    error_msg = f'Excel generation failed: No dominating_region data found for "{market_name}". Excel file is mandatory for SkyQuest submission.'
-                    print(f'[SkyQuest] ERROR: {error_msg}')
-                    return jsonify({'error': error_msg}), 400
-                    
-            except Exception as e:
-                # Excel generation error - FAIL (Excel is mandatory)
-                error_msg = f'Excel generation failed: {str(e)}. Excel file is mandatory for SkyQuest submission.'
-                print(f'[SkyQuest] ERROR: {error_msg}')
-                import traceback
-                traceback.print_exc()
-                return jsonify({'error': error_msg}), 400
+        write_file_atomic(os.path.join(submission_folder, SKYQUEST_MANIFEST_NAME),
+                          orjson.dumps({'doc': doc_path, 'image': image_path, 'excel': excel_path}))
         
         # Step 5: Upload to SkyQuest
-        print('[SkyQuest] Step 5/5: Uploading to SkyQuest API...')
-        upload_url = 'https://www.skyquestt.com/api/importRDFile'
+        skyquest_log.info('[SkyQuest] Step 5/5: Uploading to SkyQuest API...')
+        # Steps 2-4 can take longer than the token lives; this is a cache hit while it is valid
+        token, token_error = get_skyquest_token(SKYQUEST_EMAIL, SKYQUEST_PASSWORD)
+        if token_error:
+            return jsonify({'error': token_error}), 500
         headers = {'Authorization': f'Bearer {token}'}
         
-        files = {}
-        file_handles = []
-        
-        if os.path.exists(doc_path):
-            fh = open(doc_path, 'rb')
-            files['report_rd'] = fh
-            file_handles.append(fh)
+        # Upload field -> local file; the files are only opened for the upload itself.
+        # doc_path and excel_path were just found in the folder scan or written
+        # above; the image can be missing when generation produced no file
+        files = {'report_rd': doc_path}
         
         if image_path and os.path.exists(image_path):
-            fh = open(image_path, 'rb')
-            files['report_image'] = fh
-            file_handles.append(fh)
+            files['report_image'] = image_path
         
-        if excel_path and os.path.exists(excel_path):
-            fh = open(excel_path, 'rb')
-            files['report_graph'] = fh
-            file_handles.append(fh)
+        if excel_path:
+            files['report_graph'] = excel_path
         
         # Validate required files before upload
-        if 'report_rd' not in files:
-            return jsonify({'error': 'DOCX report is required but could not be generated'}), 400
-        
         if 'report_graph' not in files:
             return jsonify({'error': 'Excel file is required but could not be generated. Check logs for details.'}), 400
         
@@ -2850,70 +3439,62 @@ def submit_to_skyquest():
         
         kmi_string = ','.join(all_kmi)
         
-        # Form data to send alongside files
-        form_data = {
-            'key_market_insights': (None, kmi_string)
-        }
-        # Merge form_data into files dict (requests sends (None, value) as form fields)
-        files.update(form_data)
+        skyquest_log.debug('[SkyQuest] Files to upload:')
+        skyquest_log.debug('[SkyQuest]   - report_rd: %s', doc_path)
+        skyquest_log.debug('[SkyQuest]   - report_image: %s', image_path if image_path else "None (optional)")
+        skyquest_log.debug('[SkyQuest]   - report_graph: %s', excel_path)
+        skyquest_log.debug('[SkyQuest]   - key_market_insights: %s', kmi_string)
+        
+        with ExitStack() as stack:
+            # Each part carries its file's MIME type (the DOCX/XLSX/image types)
+            fields = {field: (os.path.basename(path), stack.enter_context(open(path, 'rb')),
+                              mimetypes.guess_type(path)[0] or 'application/octet-stream')
+                      for field, path in files.items()}
+            if MultipartEncoder is not None:
+                fields['key_market_insights'] = kmi_string
+                body = MultipartEncoder(fields=fields)
+                headers['Content-Type'] = body.content_type
+                upload_response = skyquest_session().post(SKYQUEST_UPLOAD_URL, headers=headers, data=body, timeout=300)
+            else:
+                # requests sends (None, value) as a plain form field
+                fields['key_market_insights'] = (None, kmi_string)
+                upload_response = skyquest_session().post(SKYQUEST_UPLOAD_URL, headers=headers, files=fields, timeout=300)
+        if upload_response.status_code == 401:
+            forget_skyquest_token()
         
-        print(f'[SkyQuest] Files to upload:')
-        print(f'[SkyQuest]   - report_rd: {doc_path}')
-        print(f'[SkyQuest]   - report_image: {image_path if image_path else "None (optional)"}')
-        print(f'[SkyQuest]   - report_graph: {excel_path}')
-        print(f'[SkyQuest]   - key_market_insights: {kmi_string}')
+        skyquest_log.info('[SkyQuest] Response status: %s', upload_response.status_code)
+        skyquest_log.debug('[SkyQuest] Response body: %s', upload_response.text)
         
-        try:
-            upload_response = requests.post(upload_url, headers=headers, files=files, timeout=300)
-            
-            # Close all file handles
-            for fh in file_handles:
-                fh.close()
-            
-            print(f'[SkyQuest] Response status: {upload_response.status_code}')
-            print(f'[SkyQuest] Response body: {upload_response.text}')
+        if upload_response.status_code == 200:
+            skyquest_log.info('[SkyQuest] Upload successful!')
+    
+            # Update submission status in database
+            db.execute('''
+                UPDATE rd_submissions 
+                SET downloaded = 1, last_downloaded_at = ? 
+                WHERE id = ?
+            ''', (now_ist(), submission_id))
+            db.commit()
             
-            if upload_response.status_code == 200:
-                print('[SkyQuest] Upload successful!')
-        
-                # Update submission status in database
-                db.execute('''
-                    UPDATE rd_submissions 
-                    SET downloaded = 1, last_downloaded_at = ? 
-                    WHERE id = ?
-                ''', (datetime.now(timezone.utc).isoformat(), submission_id))
-                db.commit()
-                
-                return jsonify({
-                    'success': True,
-                    'message': f'Successfully submitted {market_name} to SkyQuest',
-                    'files': {
-                        'doc': doc_path if os.path.exists(doc_path) else None,
-                        'image': image_path,
-                        'excel': excel_path
-                    },
-                    'skyquest_response': upload_response.text
-                })
-            else:
-                print(f'[SkyQuest] Upload failed: {upload_response.status_code}')
-                return jsonify({
-                    'error': f'SkyQuest upload failed with status {upload_response.status_code}',
-                    'details': upload_response.text
-                }), 500
-                
-        except Exception as e:
-            # Close file handles on error
-            for fh in file_handles:
-                try:
-                    fh.close()
-                except:
-                    pass
-            raise e
+            return jsonify({
+                'success': True,
+                'message': f'Successfully submitted {market_name} to SkyQuest',
+                'files': {
+                    'doc': doc_path,
+                    'image': image_path,
+                    'excel': excel_path
+                },
+                'skyquest_response': upload_response.text
+            })
+        else:
+            skyquest_log.warning('[SkyQuest] Upload failed: %s', upload_response.status_code)
+            return jsonify({
+                'error': f'SkyQuest upload failed with status {upload_response.status_code}',
+                'details': upload_response.text
+            }), 500
         
     except Exception as e:
-        print(f'[SkyQuest] Error: {str(e)}')
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f'[SkyQuest] Error: {e}')
         return jsonify({'error': f'Failed to submit to SkyQuest: {str(e)}'}), 500
 
 if __name__ == '__main__':
@@ -1,16 +1,32 @@
 import os
 import sqlite3
+import threading
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask import Flask, render_template, request, redirect, url_for, session, flash, g
+from passwords import hash_password, verify_password
+from flask import Flask, render_template, request, redirect, url_for, session, flash
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'auth_users.db')
 
+# Applied to every new connection; WAL lets readers run alongside a writer and
+# synchronous=NORMAL drops the per-commit fsync
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+)
+
+# One long-lived connection per worker thread (keyed on PID so forked children
+# never reuse the parent's handle)
+_db_local = threading.local()
+
 def get_db():
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(DB_PATH)
+    db = getattr(_db_local, 'conn', None)
+    if db is None or _db_local.pid != os.getpid():
+        db = _db_local.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
         db.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            db.execute(pragma)
+        _db_local.pid = os.getpid()
     return db
 
 def init_db():
@@ -30,7 +46,7 @@ def init_db():
 
 def create_user(username, password, role, created_by=None):
     db = get_db()
-    password_hash = generate_password_hash(password)
+    password_hash = hash_password(password)
     now = datetime.utcnow().isoformat()
     try:
         db.execute('INSERT INTO users (username, password_hash, role, created_by, created_at) VALUES (?,?,?,?,?)',
@@ -60,17 +76,6 @@ def create_app():
     app = Flask(__name__)
     app.secret_key = os.getenv('FLASK_SECRET', 'dev-secret-key')
 
-    @app.before_request
-    def before_request():
-        # ensure db exists
-        init_db()
-
-    @app.teardown_appcontext
-    def close_connection(exception):
-        db = getattr(g, '_database', None)
-        if db is not None:
-            db.close()
-
     # create default admin if none exists (perform immediately inside app context)
     with app.app_context():
         init_db()
@@ -114,7 +119,7 @@ def create_app():
             username = request.form.get('username')
             password = request.form.get('password')
             user = get_user_by_username(username)
-            if user and check_password_hash(user['password_hash'], password):
+            if user and verify_password(user['password_hash'], password):
                 session['username'] = user['username']
                 session['role'] = user['role']
                 update_last_login(user['username'])
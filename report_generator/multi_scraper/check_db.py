@@ -1,11 +1,17 @@
 import sqlite3
 import os
+import sys
+from urllib.request import pathname2url
 
 db_path = os.path.join(os.path.dirname(__file__), 'auth_users.db')
 print(f"Database path: {db_path}")
-print(f"Exists: {os.path.exists(db_path)}")
+exists = os.path.exists(db_path)
+print(f"Exists: {exists}")
+if not exists:
+    sys.exit(1)
 
-conn = sqlite3.connect(db_path)
+# Read-only: takes no write locks and never creates an empty database file
+conn = sqlite3.connect(f"file:{pathname2url(db_path)}?mode=ro", uri=True)
 c = conn.cursor()
 
 # Get all tables
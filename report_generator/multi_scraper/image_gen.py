@@ -1,5 +1,7 @@
 import io
+import logging
 import os
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 import google.genai as genai
 from dotenv import load_dotenv
@@ -9,6 +11,11 @@ load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+logger = logging.getLogger(__name__)
+
+# Shared Vertex AI client (auth and HTTP connections reused across images)
+_genai_client = None
+
 TEMPLATE_PATH = "temp2.png"
 OUTPUT_SIZE = (500, 600)
 
@@ -22,40 +29,56 @@ MARKET_TEXT_FONT_SIZE = 30
 # EXACT coordinates of the Image box
 IMAGE_BOX = (16, 307, 484, 586)
 
-def load_font(size, font_path=None):
-    font_paths = []
-    
-    if font_path:
-        font_paths.append(font_path)
-    
-    font_paths.extend([
-        FONT_PATH_POPPINS,
-        "Poppins-Bold.ttf",
-        "/usr/share/fonts/truetype/poppins/Poppins-Bold.ttf",
-        "Poppins-Regular.ttf",
-        "/usr/share/fonts/truetype/poppins/Poppins-Regular.ttf",
-        "Poppins.ttf",
-        FONT_PATH_FALLBACK,
-        # macOS font paths
-        "/System/Library/Fonts/Helvetica.ttc",
-        "/System/Library/Fonts/Supplemental/Arial.ttf",
-        "/Library/Fonts/Arial.ttf",
-        # Linux paths
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-    ])
-    
+def get_genai_client():
+    """Create the Gemini client on first use and reuse it afterwards."""
+    global _genai_client
+    if _genai_client is None:
+        _genai_client = genai.Client(vertexai=True, api_key=GEMINI_API_KEY)
+    return _genai_client
+
+FONT_CANDIDATES = (
+    FONT_PATH_POPPINS,
+    "Poppins-Bold.ttf",
+    "/usr/share/fonts/truetype/poppins/Poppins-Bold.ttf",
+    "Poppins-Regular.ttf",
+    "/usr/share/fonts/truetype/poppins/Poppins-Regular.ttf",
+    "Poppins.ttf",
+    FONT_PATH_FALLBACK,
+    # macOS font paths
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    # Linux paths
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+)
+
+@lru_cache(maxsize=8)
+def base_font(font_path=None):
+    """First candidate font (font_path first) that exists and loads, or None.
+
+    The candidate paths are probed once; every size is derived from this font.
+    """
+    font_paths = (font_path,) + FONT_CANDIDATES if font_path else FONT_CANDIDATES
     for fp in font_paths:
         try:
             if os.path.exists(fp):
-                font = ImageFont.truetype(fp, size)
-                print(f"Loaded font: {fp} at size {size}")
+                font = ImageFont.truetype(fp, MARKET_TEXT_FONT_SIZE)
+                logger.debug("Loaded font: %s", fp)
                 return font
         except Exception:
             continue
+    return None
+
+# The autosize loop asks for many sizes per image; each size is built once
+@lru_cache(maxsize=64)
+def load_font(size, font_path=None):
+    font = base_font(font_path)
+    if font is not None:
+        return font if font.size == size else font.font_variant(size=size)
     
-    print(f"WARNING: Could not find any TrueType fonts. Text will be very small!")
-    print(f"Please install a font or provide correct font path.")
+    logger.warning("Could not find any TrueType fonts. Text will be very small! "
+                   "Please install a font or provide correct font path.")
     return ImageFont.load_default()
 
 def genai_image_to_pil(genai_image):
@@ -74,41 +97,66 @@ def compress_webp_under_target(image: Image.Image, output_path: str, target_kb:
     Compress PIL Image to WebP under target_kb, keeping dimensions.
     Returns final quality used and actual size.
     """
-    quality = 90
-    while quality >= 20:
+    # Highest of the 20, 25, ..., 90 quality steps under target, by binary
+    # search (size grows with quality): ~4 encodes instead of up to 15
+    qualities = range(20, 95, 5)
+    lo, hi = 0, len(qualities) - 1
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
         buffer = io.BytesIO()
-        image.save(buffer, format="WEBP", quality=quality, method=6)
+        image.save(buffer, format="WEBP", quality=qualities[mid], method=6)
         size_kb = buffer.tell() / 1024
         if size_kb <= target_kb:
-            with open(output_path, "wb") as f:
-                f.write(buffer.getvalue())
-            return quality, size_kb
-        quality -= 5
-    
-    image.save(output_path, format="WEBP", quality=20, method=6)
-    size_kb = os.path.getsize(output_path) / 1024
-    return 20, size_kb
+            best = (qualities[mid], buffer, size_kb)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+            if mid == 0:
+                # Nothing fits; keep the lowest quality
+                best = (qualities[mid], buffer, size_kb)
+
+    quality, buffer, size_kb = best
+    with open(output_path, "wb") as f:
+        f.write(buffer.getvalue())
+    return quality, size_kb
+
+# Width estimates this close to the limit are re-measured on the whole line
+WRAP_EXACT_MARGIN = 2
 
 def wrap_text(draw, text, font, max_width):
     """
     Wrap text into multiple lines based on rendered width.
     Line breaks occur only at word boundaries.
+
+    Each word is measured once and line widths are summed from those;
+    only lines within WRAP_EXACT_MARGIN of max_width are measured whole.
     """
     words = text.split()
     lines = []
     current_line = ""
+    current_width = 0
+    space_width = draw.textlength(" ", font=font)
 
     for word in words:
-        test_line = word if not current_line else current_line + " " + word
-        
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        text_width = bbox[2] - bbox[0]
+        word_width = draw.textlength(word, font=font)
+        if not current_line:
+            test_line, text_width = word, word_width
+        else:
+            test_line = current_line + " " + word
+            text_width = current_width + space_width + word_width
 
-        if text_width <= max_width:
-            current_line = test_line
+        if abs(text_width - max_width) <= WRAP_EXACT_MARGIN:
+            bbox = draw.textbbox((0, 0), test_line, font=font)
+            fits = bbox[2] - bbox[0] <= max_width
+        else:
+            fits = text_width <= max_width
+
+        if fits:
+            current_line, current_width = test_line, text_width
         else:
             lines.append(current_line)
-            current_line = word
+            current_line, current_width = word, word_width
 
     if current_line:
         lines.append(current_line)
@@ -132,7 +180,7 @@ def generate_scene_prompt_with_llm(market_name: str):
     Gemini 2.5 Flash (Vertex AI):
     Converts a market name into ONE short, concrete, real-life scene sentence.
     """
-    client = genai.Client(vertexai=True, api_key=GEMINI_API_KEY)
+    client = get_genai_client()
 
     prompt = (
     f"Generate 1 short, simple, easy to understand sentences written as an image command for an image generation model. "
@@ -159,23 +207,25 @@ def generate_market_image(market_name: str):
     base = base.resize(OUTPUT_SIZE)
     draw = ImageDraw.Draw(base)
 
-    font_size = MARKET_TEXT_FONT_SIZE
     min_font_size = 20
 
-    while True:
-        font = load_font(font_size)
-        lines = wrap_text(draw, market_name, font, MARKET_TEXT_MAX_WIDTH)
-
-        if len(lines) <= 2:
-            break
-
-        if font_size <= min_font_size:
-            lines = force_two_lines(market_name)
-            font = load_font(min_font_size)
-            font_size = min_font_size
-            break
+    # Binary search for the largest size whose wrapped title fits in two lines
+    # (smaller fonts never need more lines)
+    font_size, lines = None, None
+    lo, hi = min_font_size, MARKET_TEXT_FONT_SIZE
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        mid_lines = wrap_text(draw, market_name, load_font(mid), MARKET_TEXT_MAX_WIDTH)
+        if len(mid_lines) <= 2:
+            font_size, lines = mid, mid_lines
+            lo = mid + 1
+        else:
+            hi = mid - 1
 
-        font_size -= 1
+    if font_size is None:
+        font_size = min_font_size
+        lines = force_two_lines(market_name)
+    font = load_font(font_size)
 
     y = MARKET_TEXT_POSITION[1]
     for line in lines:
@@ -183,7 +233,7 @@ def generate_market_image(market_name: str):
         y += int(font_size * 1.2)
 
     # Generate AI image
-    client = genai.Client(vertexai=True, api_key=GEMINI_API_KEY)
+    client = get_genai_client()
     scene_prompt = generate_scene_prompt_with_llm(market_name)
 
     # Imagen prompt
@@ -1,18 +1,39 @@
-import json
+import asyncio
+import hashlib
 import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import orjson
 from openpyxl import Workbook
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 # ================= GPT CLIENT =================
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Used by main() to fan the per-file GPT calls out concurrently
+async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Max GPT calls in flight at once in main(); tune to the account's rate limit
+GPT_CONCURRENCY = 20
+# Markets packed into one prompt by main()'s batched pre-pass
+GPT_BATCH_SIZE = 10
+# Threads reading dominating_region JSON files in main()
+JSON_READ_WORKERS = 8
 
 # ================= PATHS =================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_FOLDER = os.path.join(BASE_DIR, "..", "dominating_region")
+# One JSON file per distinct GPT prompt, so repeat markets skip the API call
+GPT_CACHE_DIR = os.path.join(BASE_DIR, "..", ".gpt_cache")
+GPT_MODEL = "gpt-5-mini"
+
+# Sections of the GPT answer, see build_dom_fast_prompt
+DOMINATING_RE = re.compile(r"Dominating:\s*(.*?)(?:Fastest Growing:|$)", re.S)
+FASTEST_GROWING_RE = re.compile(r"Fastest Growing:\s*(.*)", re.S)
+# Characters Windows does not allow in file names
+UNSAFE_FILENAME_CHARS = str.maketrans("", "", '\\/:*?"<>|')
 
 
 # ================= HELPERS =================
@@ -30,15 +51,12 @@ def get_unit_suffix(unit):
 
 
 def clean_filename(name):
-    return re.sub(r'[\\/:*?"<>|]', '', name).strip()
+    return name.translate(UNSAFE_FILENAME_CHARS).strip()
 
 
 # ================= GPT SINGLE CALL (DOM + FAST) =================
-def get_gpt_dominating_and_fastest_sub_segments(market_name, sub_segments):
-    if not sub_segments:
-        return [], []
-
-    prompt = f"""
+def build_dom_fast_prompt(market_name, sub_segments):
+    return f"""
     Act like a research analyst.
 
     From the following sub segments of the {market_name}, do TWO things:
@@ -62,33 +80,38 @@ def get_gpt_dominating_and_fastest_sub_segments(market_name, sub_segments):
     - No explanations
     """
 
-    response = client.chat.completions.create(
-        model="gpt-5-mini",
-        messages=[{"role": "user", "content": prompt}],
-    )
 
-    text = response.choices[0].message.content.strip()
+def known_sub_segments(candidates, by_lower):
+    """Sub segment names among candidates, in order, once each.
+
+    by_lower maps lower-cased sub segment names to their original spelling, so
+    GPT's capitalization does not matter and the output uses the input's names.
+    """
+    found, seen = [], set()
+    for s in candidates:
+        if not isinstance(s, str):
+            continue
+        name = by_lower.get(s.strip().lower())
+        if name is not None and name not in seen:
+            seen.add(name)
+            found.append(name)
+    return found
+
+
+def parse_dom_fast_response(text, sub_segments):
+    text = text.strip()
 
     dom_list, fast_list = [], []
+    by_lower = {seg.lower(): seg for seg in reversed(sub_segments)}
 
-    dom_match = re.search(r"Dominating:\s*(.*?)(Fastest Growing:|$)", text, re.S)
-    fast_match = re.search(r"Fastest Growing:\s*(.*)", text, re.S)
+    dom_match = DOMINATING_RE.search(text)
+    fast_match = FASTEST_GROWING_RE.search(text)
 
     if dom_match:
-        dom_raw = dom_match.group(1)
-        dom_list = [
-            s.strip()
-            for s in dom_raw.replace("\n", ",").split(",")
-            if s.strip() in sub_segments
-        ]
+        dom_list = known_sub_segments(dom_match.group(1).replace("\n", ",").split(","), by_lower)
 
     if fast_match:
-        fast_raw = fast_match.group(1)
-        fast_list = [
-            s.strip()
-            for s in fast_raw.replace("\n", ",").split(",")
-            if s.strip() in sub_segments
-        ]
+        fast_list = known_sub_segments(fast_match.group(1).replace("\n", ",").split(","), by_lower)
 
     # Safe fallback
     if not dom_list:
@@ -99,30 +122,189 @@ def get_gpt_dominating_and_fastest_sub_segments(market_name, sub_segments):
     return dom_list, fast_list
 
 
+# ================= GPT BATCH CALL (MANY MARKETS) =================
+def build_dom_fast_batch_prompt(markets):
+    entries = "\n\n".join(
+        f"{i}. {market_name}\n    Sub segments: {', '.join(sub_segments)}"
+        for i, (market_name, sub_segments) in enumerate(markets, 1)
+    )
+    return f"""
+    Act like a research analyst.
+
+    For EACH numbered market below, do TWO things with its sub segments:
+
+    1. Rank sub segments based on DOMINANCE
+    2. Rank sub segments based on FASTEST GROWTH
+
+    {entries}
+
+    Output a JSON object keyed by the market number, STRICTLY like this:
+
+    {{"1": {{"dominating": ["segment1", "segment2"], "fastest_growing": ["segment1", "segment2"]}}}}
+
+    Rules:
+    - Use ONLY the sub segment names listed for that market
+    - No explanations
+    """
+
+
+async def get_gpt_dominating_and_fastest_sub_segments_batch(markets):
+    """One GPT call for many (market_name, sub_segments) pairs.
+
+    Returns a list aligned with markets holding (dom_list, fast_list), or None
+    for a market the answer did not cover usably.
+    """
+    response = await async_client.chat.completions.create(
+        model=GPT_MODEL,
+        messages=[{"role": "user", "content": build_dom_fast_batch_prompt(markets)}],
+        response_format={"type": "json_object"},
+    )
+    answer = orjson.loads(response.choices[0].message.content)
+
+    results = []
+    for i, (market_name, sub_segments) in enumerate(markets, 1):
+        entry = answer.get(str(i)) if isinstance(answer, dict) else None
+        if not isinstance(entry, dict):
+            results.append(None)
+            continue
+        by_lower = {seg.lower(): seg for seg in reversed(sub_segments)}
+        dom_list = known_sub_segments(entry.get("dominating") or [], by_lower)
+        fast_list = known_sub_segments(entry.get("fastest_growing") or [], by_lower)
+        results.append((dom_list, fast_list) if dom_list and fast_list else None)
+    return results
+
+
+# ================= GPT RESPONSE CACHE =================
+def gpt_cache_path(prompt):
+    key = hashlib.blake2b(f"{GPT_MODEL}|{prompt}".encode(), digest_size=16).hexdigest()
+    return os.path.join(GPT_CACHE_DIR, f"{key}.json")
+
+
+def read_gpt_cache(prompt):
+    """Cached (dom_list, fast_list) for this exact prompt, or None."""
+    try:
+        with open(gpt_cache_path(prompt), "rb") as f:
+            cached = orjson.loads(f.read())
+        return cached["dominating"], cached["fastest_growing"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_gpt_cache(prompt, sub_segments, dom_list, fast_list):
+    # parse_dom_fast_response falls back to the input list when GPT's answer
+    # didn't parse; leave those uncached so the next run asks again
+    if dom_list is sub_segments or fast_list is sub_segments:
+        return
+    path = gpt_cache_path(prompt)
+    # Write to a temp file and rename, so concurrent readers never see half a file
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        os.makedirs(GPT_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps({"dominating": dom_list, "fastest_growing": fast_list}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write GPT cache {path}: {e}")
+
+
+def get_gpt_dominating_and_fastest_sub_segments(market_name, sub_segments):
+    if not sub_segments:
+        return [], []
+
+    prompt = build_dom_fast_prompt(market_name, sub_segments)
+    cached = read_gpt_cache(prompt)
+    if cached is not None:
+        return cached
+
+    response = client.chat.completions.create(
+        model=GPT_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    dom_list, fast_list = parse_dom_fast_response(response.choices[0].message.content, sub_segments)
+    write_gpt_cache(prompt, sub_segments, dom_list, fast_list)
+    return dom_list, fast_list
+
+
+async def get_gpt_dominating_and_fastest_sub_segments_async(market_name, sub_segments):
+    if not sub_segments:
+        return [], []
+
+    prompt = build_dom_fast_prompt(market_name, sub_segments)
+    cached = read_gpt_cache(prompt)
+    if cached is not None:
+        return cached
+
+    response = await async_client.chat.completions.create(
+        model=GPT_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    dom_list, fast_list = parse_dom_fast_response(response.choices[0].message.content, sub_segments)
+    write_gpt_cache(prompt, sub_segments, dom_list, fast_list)
+    return dom_list, fast_list
+
+
 # ================= MAIN EXCEL GENERATOR =================
+def load_market_json(json_path):
+    with open(json_path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def first_segment_of(data):
+    segments = data.get("SEGMENTS", {})
+    first_segment = next(iter(segments.keys()), "")
+    return first_segment, segments.get(first_segment, [])
+
+
 def generate_excel(json_path):
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_market_json(json_path)
+    _, raw_sub_segments = first_segment_of(data)
+
+    # ===== SINGLE GPT CALL =====
+    dominating_segments, fastest_growing_segments = (
+        get_gpt_dominating_and_fastest_sub_segments(
+            data.get("market_name", ""), raw_sub_segments
+        )
+    )
+    return build_workbook(data, dominating_segments, fastest_growing_segments)
 
+
+async def generate_excel_async(json_path):
+    """generate_excel with the GPT call awaited; the workbook itself is built synchronously."""
+    data = load_market_json(json_path)
+    _, raw_sub_segments = first_segment_of(data)
+
+    dominating_segments, fastest_growing_segments = (
+        await get_gpt_dominating_and_fastest_sub_segments_async(
+            data.get("market_name", ""), raw_sub_segments
+        )
+    )
+    return build_workbook(data, dominating_segments, fastest_growing_segments)
+
+
+def sheet_header(position, above_name):
+    """Rows 1-4 shared by every sheet: position, above_name, below_name, blank."""
+    return [["position", position], ["above_name", above_name], ["below_name"], []]
+
+
+def build_workbook(data, dominating_segments, fastest_growing_segments):
     market_name = data.get("market_name", "")
     unit = data.get("unit", "")
     regional_ranking = data.get("REGIONAL_RANKING", {})
     europe_classification = data.get("EUROPE_COUNTRY_CLASSIFICATION", {})
-    segments = data.get("SEGMENTS", {})
 
     first_region = regional_ranking.get("first", "")
     second_region = regional_ranking.get("second", "")
 
-    first_segment = next(iter(segments.keys()), "")
-    raw_sub_segments = segments.get(first_segment, [])
+    first_segment, _ = first_segment_of(data)
+
+    # Country for each Europe classification, first one listed wins
+    europe_by_class = {}
+    for country, classification in europe_classification.items():
+        europe_by_class.setdefault(classification, country)
+    europe_dominant = europe_by_class.get("dominant", "")
+    europe_fastest = europe_by_class.get("fastest_growing", "")
+    europe_emerging = europe_by_class.get("emerging", "")
 
-    # ===== SINGLE GPT CALL =====
-    dominating_segments, fastest_growing_segments = (
-        get_gpt_dominating_and_fastest_sub_segments(
-            market_name, raw_sub_segments
-        )
-    )
-    
     # Print dominating and fastest growing to terminal
     print("\n" + "="*60)
     print(f"MARKET: {market_name}")
@@ -137,163 +319,183 @@ def generate_excel(json_path):
 
     unit_suffix = get_unit_suffix(unit)
     years = list(range(2025, 2034))
+    # The segment sheets chart at most the top five of each ranking
+    top_dominating = dominating_segments[:5]
+    top_fastest = fastest_growing_segments[:5]
 
-    wb = Workbook()
+    # Each sheet is built as a list of rows and appended in one pass
+    sheets = []
 
     # ================= SHEET 1 =================
-    ws1 = wb.active
-    ws1.title = "global_market_by_region"
-
-    ws1["A1"] = "position"
-    ws1["B1"] = 1
-    ws1["A2"] = "above_name"
-    ws1["B2"] = f"{market_name} ($ {unit_suffix})"
-    ws1["A3"] = "below_name"
-
-    ws1["A5"] = "Year"
-    ws1["B5"] = regional_ranking.get("first", "")
-    ws1["C5"] = regional_ranking.get("second", "")
-    ws1["D5"] = regional_ranking.get("third", "")
-    ws1["E5"] = "Middle East & Africa"
-    ws1["F5"] = "Latin America"
-
-    for i, year in enumerate(years):
-        r = 6 + i
-        ws1[f"A{r}"] = year
-        ws1[f"B{r}"] = 11 + i
-        ws1[f"C{r}"] = 10 + i
-        ws1[f"D{r}"] = 9 + i
-        ws1[f"E{r}"] = 8 + i
-        ws1[f"F{r}"] = 7 + i
+    rows = sheet_header(1, f"{market_name} ($ {unit_suffix})")
+    rows.append([
+        "Year",
+        regional_ranking.get("first", ""),
+        regional_ranking.get("second", ""),
+        regional_ranking.get("third", ""),
+        "Middle East & Africa",
+        "Latin America",
+    ])
+    rows += [[year, 11 + i, 10 + i, 9 + i, 8 + i, 7 + i] for i, year in enumerate(years)]
+    sheets.append(("global_market_by_region", rows))
 
     # ================= SHEET 2 =================
-    ws2 = wb.create_sheet("country_share")
-
-    ws2["A1"] = "position"
-    ws2["B1"] = 2
-    ws2["A2"] = "above_name"
-    ws2["B2"] = f"Country Share for {first_region} Region (%)"
-    ws2["A3"] = "below_name"
-    ws2["A5"] = "Country"
-    ws2["B5"] = 2025
+    rows = sheet_header(2, f"Country Share for {first_region} Region (%)")
+    rows.append(["Country", 2025])
 
     if first_region == "North America":
-        ws2["A6"], ws2["A7"] = "US", "Canada"
-        ws2["B6"], ws2["B7"] = 25, 15
+        rows += [["US", 25], ["Canada", 15]]
     elif first_region == "Asia Pacific":
-        ws2["A6"], ws2["A7"] = "Japan", "South Korea"
-        ws2["B6"], ws2["B7"] = 25, 15
+        rows += [["Japan", 25], ["South Korea", 15]]
     elif first_region == "Europe":
-        dom = next((k for k, v in europe_classification.items() if v == "dominant"), "")
-        fast = next((k for k, v in europe_classification.items() if v == "fastest_growing"), "")
-        emer = next((k for k, v in europe_classification.items() if v == "emerging"), "")
-        ws2["A6"], ws2["A7"], ws2["A8"] = dom, fast, emer
-        ws2["B6"], ws2["B7"], ws2["B8"] = 25, 15, 5
+        rows += [[europe_dominant, 25], [europe_fastest, 15], [europe_emerging, 5]]
+    sheets.append(("country_share", rows))
 
     # ================= SHEET 3 (DOMINATING) =================
-    ws3 = wb.create_sheet("Segment_1_Share")
-
-    ws3["A1"] = "position"
-    ws3["B1"] = 3
-    ws3["A2"] = "above_name"
-    ws3["B2"] = f"{market_name} By {first_segment} ($ {unit_suffix})"
-    ws3["A3"] = "below_name"
-    ws3["A5"] = "Year"
-
-    for i, seg in enumerate(dominating_segments[:5]):
-        ws3.cell(row=5, column=2 + i, value=seg)
-
-    for i, year in enumerate(years):
-        r = 6 + i
-        ws3[f"A{r}"] = year
-        for j in range(len(dominating_segments[:5])):
-            ws3.cell(row=r, column=2 + j, value=12 - j + i)
+    rows = sheet_header(3, f"{market_name} By {first_segment} ($ {unit_suffix})")
+    rows.append(["Year", *top_dominating])
+    rows += [
+        [year, *(12 - j + i for j in range(len(top_dominating)))]
+        for i, year in enumerate(years)
+    ]
+    sheets.append(("Segment_1_Share", rows))
 
     # ================= SHEET 4 (FASTEST GROWING) =================
-    ws4 = wb.create_sheet("cagr")
-
-    ws4["A1"] = "position"
-    ws4["B1"] = 4
-    ws4["A2"] = "above_name"
-    ws4["B2"] = f"{market_name} By {first_segment} (%)"
-    ws4["A3"] = "below_name"
-    ws4["A5"] = "Year"
-
-    for i, seg in enumerate(fastest_growing_segments[:5]):
-        ws4.cell(row=5, column=2 + i, value=seg)
-
-    for i, year in enumerate(years):
-        r = 6 + i
-        ws4[f"A{r}"] = year
-        for j in range(len(fastest_growing_segments[:5])):
-            ws4.cell(row=r, column=2 + j, value=12 - j + i)
+    rows = sheet_header(4, f"{market_name} By {first_segment} (%)")
+    rows.append(["Year", *top_fastest])
+    rows += [
+        [year, *(12 - j + i for j in range(len(top_fastest)))]
+        for i, year in enumerate(years)
+    ]
+    sheets.append(("cagr", rows))
 
     # ================= SHEET 5 (DOMINATING) =================
-    ws5 = wb.create_sheet("Segment_2_Share")
-
-    ws5["A1"] = "position"
-    ws5["B1"] = 5
-    ws5["A2"] = "above_name"
-    ws5["B2"] = f"{market_name} By {first_segment}"
-    ws5["A3"] = "below_name"
-
-    ws5["A5"] = "Size"
-    ws5["B5"] = "Segment Name"
+    rows = sheet_header(5, f"{market_name} By {first_segment}")
+    rows.append(["Size", "Segment Name"])
 
     sizes = [1000, 900, 800, 700, 600]
-    for i, seg in enumerate(dominating_segments[:5]):
-        ws5[f"A{6 + i}"] = sizes[i]
-        ws5[f"B{6 + i}"] = seg
+    rows += [[size, seg] for size, seg in zip(sizes, top_dominating)]
+    sheets.append(("Segment_2_Share", rows))
 
     # ================= SHEET 6 =================
-    ws6 = wb.create_sheet("worldmap")
-
-    ws6["A1"] = "position"
-    ws6["B1"] = 6
-    ws6["A2"] = "above_name"
-    ws6["B2"] = f"{market_name} By Geography"
-    ws6["A3"] = "below_name"
-
-    ws6["A5"] = "Size"
-    ws6["B5"] = "Region"
-
-    ws6["A6"], ws6["A7"], ws6["A8"], ws6["A9"] = 900, 900, 700, 700
+    rows = sheet_header(6, f"{market_name} By Geography")
+    rows.append(["Size", "Region"])
+
+    def top_two_countries(region):
+        if region == "North America":
+            return "United States", "Canada"
+        elif region == "Europe":
+            return europe_dominant, europe_fastest
+        elif region == "Asia Pacific":
+            return "Japan", "South Korea"
+        return None, None
+
+    first_top, first_second = top_two_countries(first_region)
+    second_top, second_second = top_two_countries(second_region)
+    rows += [[900, first_top], [900, first_second], [700, second_top], [700, second_second]]
+    sheets.append(("worldmap", rows))
+
+    # Write-only: rows are serialized as they are appended, with no in-memory
+    # cell grid. The returned workbook can only be saved once.
+    wb = Workbook(write_only=True)
+    for title, rows in sheets:
+        ws = wb.create_sheet(title)
+        for row in rows:
+            ws.append(row)
 
-    def europe_top_two():
-        dom = next((k for k, v in europe_classification.items() if v == "dominant"), "")
-        fast = next((k for k, v in europe_classification.items() if v == "fastest_growing"), "")
-        return dom, fast
+    return wb, market_name
 
-    if first_region == "North America":
-        ws6["B6"], ws6["B7"] = "United States", "Canada"
-    elif first_region == "Europe":
-        ws6["B6"], ws6["B7"] = europe_top_two()
-    elif first_region == "Asia Pacific":
-        ws6["B6"], ws6["B7"] = "Japan", "South Korea"
 
-    if second_region == "North America":
-        ws6["B8"], ws6["B9"] = "United States", "Canada"
-    elif second_region == "Europe":
-        ws6["B8"], ws6["B9"] = europe_top_two()
-    elif second_region == "Asia Pacific":
-        ws6["B8"], ws6["B9"] = "Japan", "South Korea"
+# ================= ENTRY POINT =================
+async def prefetch_gpt_answers(markets, sem):
+    """Fill the GPT cache for uncached (market_name, sub_segments), GPT_BATCH_SIZE per call.
 
-    return wb, market_name
+    Markets a batch leaves unanswered (or a failed batch) are simply left
+    uncached; resolve_gpt_answers then asks for them one by one.
+    """
+    pending = [
+        (market_name, sub_segments)
+        for market_name, sub_segments in markets
+        if sub_segments and read_gpt_cache(build_dom_fast_prompt(market_name, sub_segments)) is None
+    ]
+
+    async def run_batch(batch):
+        async with sem:
+            try:
+                answers = await get_gpt_dominating_and_fastest_sub_segments_batch(batch)
+            except Exception as e:
+                print(f"Batched GPT call failed, asking per market instead: {e}")
+                return
+        for (market_name, sub_segments), answer in zip(batch, answers):
+            if answer is not None:
+                write_gpt_cache(build_dom_fast_prompt(market_name, sub_segments), sub_segments, *answer)
+
+    await asyncio.gather(*(
+        run_batch(pending[i:i + GPT_BATCH_SIZE])
+        for i in range(0, len(pending), GPT_BATCH_SIZE)
+    ))
+
+
+async def resolve_gpt_answers(datas):
+    """(dom_list, fast_list) for each loaded market JSON, or the exception its GPT call raised."""
+    sem = asyncio.Semaphore(GPT_CONCURRENCY)
+    markets = [(data.get("market_name", ""), first_segment_of(data)[1]) for data in datas]
+    await prefetch_gpt_answers(markets, sem)
+
+    async def resolve_one(market_name, sub_segments):
+        async with sem:
+            return await get_gpt_dominating_and_fastest_sub_segments_async(market_name, sub_segments)
+
+    return await asyncio.gather(*(resolve_one(*m) for m in markets), return_exceptions=True)
+
+
+def save_excel(data, dominating_segments, fastest_growing_segments):
+    """Build and save one workbook (in a pool worker); returns the output file name."""
+    wb, market_name = build_workbook(data, dominating_segments, fastest_growing_segments)
+    output_file = f"{clean_filename(market_name)}.xlsx"
+    wb.save(output_file)
+    return output_file
 
 
-# ================= ENTRY POINT =================
 def main():
     json_files = [f for f in os.listdir(JSON_FOLDER) if f.endswith(".json")]
     if not json_files:
         print("No JSON files found.")
         return
 
-    json_path = os.path.join(JSON_FOLDER, json_files[0])
-    wb, market_name = generate_excel(json_path)
-
-    output_file = f"{clean_filename(market_name)}.xlsx"
-    wb.save(output_file)
-    print(f"Excel file generated successfully: {output_file}")
+    def try_load(json_file):
+        try:
+            return load_market_json(os.path.join(JSON_FOLDER, json_file))
+        except (OSError, ValueError) as e:
+            return e
+
+    # File reads release the GIL, so a few threads overlap the disk waits
+    with ThreadPoolExecutor(max_workers=JSON_READ_WORKERS) as readers:
+        loaded = []
+        for json_file, data in zip(json_files, readers.map(try_load, json_files)):
+            if isinstance(data, Exception):
+                print(f"Failed to generate Excel for {json_file}: {data}")
+            else:
+                loaded.append((json_file, data))
+
+    # GPT is network bound and runs concurrently here; the answers are small, so
+    # they go to the worker processes as plain arguments
+    answers = asyncio.run(resolve_gpt_answers([data for _, data in loaded]))
+
+    # Building and serializing the workbooks is CPU bound, one process per core
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = []
+        for (json_file, data), answer in zip(loaded, answers):
+            if isinstance(answer, Exception):
+                print(f"Failed to generate Excel for {json_file}: {answer}")
+                continue
+            futures.append((json_file, pool.submit(save_excel, data, *answer)))
+
+        for json_file, future in futures:
+            try:
+                print(f"Excel file generated successfully: {future.result()}")
+            except Exception as e:
+                print(f"Failed to generate Excel for {json_file}: {e}")
 
 
 if __name__ == "__main__":
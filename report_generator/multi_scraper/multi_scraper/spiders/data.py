@@ -165,8 +165,10 @@ def save_dominating_regions_json(market_name, regions_data, europe_data, market_
     file_path = os.path.join(folder_path, f"{cleaned_filename}_dominating_regions.json")
     
     # Save to JSON file
+    # Encode up front so the file is written in one call
+    content = json.dumps(output_data, indent=2, ensure_ascii=False)
     with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+        f.write(content)
     
     print(f"\n✅ Saved Dominating Regions JSON: {file_path}\n")
     return file_path
@@ -4469,8 +4471,10 @@ class MarketResearchSpider(scrapy.Spider):
         # Format: <market_name>__<domain>.json
         filename = f"{cleaned_market_name}__{domain}.json"
         output_path = os.path.join(self.output_dir, filename)
+        # Encode up front so the file is written in one call
+        content = json.dumps(data, indent=4, ensure_ascii=False)
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.write(content)
         self.logger.info(f"✅ Saved: {output_path}")
  
     def closed(self, reason):
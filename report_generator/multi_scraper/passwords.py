@@ -0,0 +1,45 @@
+"""Password hashing shared by app.py and auth_app.py (one users table, one format).
+
+New hashes are pbkdf2:sha256, which verifies on every Python build. argon2-cffi
+is optional and not in requirements.txt: only when it is installed do new
+hashes become argon2id. Either kind verifies wherever argon2-cffi is present.
+"""
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# pbkdf2:sha256 verifies on every Python build; werkzeug's scrypt needs hashlib.scrypt
+# (OpenSSL), so a scrypt hash written on one host can be unverifiable on another
+PASSWORD_HASH_METHOD = 'pbkdf2:sha256'
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:
+    PASSWORD_HASHER = None
+else:
+    PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+def hash_password(password):
+    if PASSWORD_HASHER is not None:
+        return PASSWORD_HASHER.hash(password)
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD, salt_length=16)
+
+def verify_password(password_hash, password):
+    """Check password against an argon2 or werkzeug hash from the users table."""
+    if password_hash.startswith('$argon2'):
+        if PASSWORD_HASHER is None:
+            return False
+        try:
+            return PASSWORD_HASHER.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+def password_needs_rehash(password_hash):
+    """True when a verified hash isn't in the format hash_password writes now.
+
+    Login rehashes these, so host-specific scrypt hashes (and werkzeug hashes,
+    once argon2-cffi is installed) are upgraded as users sign in.
+    """
+    if PASSWORD_HASHER is not None:
+        return not password_hash.startswith('$argon2') or PASSWORD_HASHER.check_needs_rehash(password_hash)
+    return not password_hash.startswith(f'{PASSWORD_HASH_METHOD}:')
@@ -0,0 +1,111 @@
+"""Long-lived Scrapy worker process.
+
+CrawlerProcess.start() cannot be called twice in one Python process, so the
+app used to fork a brand-new process (and Twisted reactor) for every
+/api/scrape request. Instead, a single child process keeps one reactor and
+one CrawlerRunner alive; crawl jobs arrive over a multiprocessing queue and
+each finished crawl replies with an error message (or None on success).
+"""
+import multiprocessing
+import queue
+import threading
+import time
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# How often a waiting request checks that the worker is still alive (seconds)
+LIVENESS_POLL_SECONDS = 5
+
+# Spawn rather than fork: a forked child would inherit the app's logging
+# QueueHandler (whose listener thread doesn't survive the fork, so records
+# would pile up undrained) and locks held by other request threads
+_mp = multiprocessing.get_context('spawn')
+
+
+def _worker_main(jobs, results):
+    """Child process entry point: run the reactor forever, one crawl per job."""
+    from scrapy.crawler import CrawlerRunner
+    from scrapy.utils.log import configure_logging
+    from scrapy.utils.project import get_project_settings
+    from scrapy.utils.reactor import install_reactor
+
+    settings = get_project_settings()
+    settings.set('LOG_LEVEL', 'ERROR', priority='cmdline')
+    settings.set('USER_AGENT', USER_AGENT, priority='cmdline')
+    configure_logging(settings)
+    # The reactor must be installed before anything imports twisted.internet.reactor
+    install_reactor(settings['TWISTED_REACTOR'])
+
+    from twisted.internet import reactor, threads
+    from multi_scraper.spiders.data import MarketResearchSpider
+
+    runner = CrawlerRunner(settings)
+
+    def next_job(_=None):
+        # Block on the queue in a reactor thread so the event loop stays free
+        threads.deferToThread(jobs.get).addCallback(run_job)
+
+    def run_job(urls):
+        if urls is None:
+            reactor.stop()
+            return
+        d = runner.crawl(MarketResearchSpider, urls=','.join(urls), no_docx=True)
+        d.addCallbacks(lambda _: results.put(None),
+                       lambda failure: results.put(failure.getErrorMessage()))
+        d.addBoth(next_job)
+
+    reactor.callWhenRunning(next_job)
+    reactor.run()
+
+
+class ScrapeWorker:
+    """Parent-side handle: starts the worker lazily and runs crawls one at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+        self._jobs = None
+        self._results = None
+
+    def _ensure_started(self):
+        if self._process is not None and self._process.is_alive():
+            return
+        self._jobs = _mp.Queue()
+        self._results = _mp.Queue()
+        self._process = _mp.Process(target=_worker_main, args=(self._jobs, self._results), daemon=True)
+        self._process.start()
+
+    def crawl(self, urls, timeout=None):
+        """Crawl urls in the worker and block until done; returns an error message or None.
+
+        Crawls are serialized because every spider run writes into the shared
+        scraped_json folder that the caller collects afterwards. If the crawl
+        takes longer than timeout seconds the worker is killed (its reactor
+        cannot abandon a running crawl) and restarted on the next call.
+        """
+        with self._lock:
+            self._ensure_started()
+            self._jobs.put(list(urls))
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                wait = LIVENESS_POLL_SECONDS
+                if deadline is not None:
+                    wait = min(wait, max(deadline - time.monotonic(), 0))
+                try:
+                    return self._results.get(timeout=wait)
+                except queue.Empty:
+                    if not self._process.is_alive():
+                        self._process = None
+                        return 'Scrapy worker exited unexpectedly'
+                    if deadline is not None and time.monotonic() >= deadline:
+                        self._process.terminate()
+                        self._process.join(timeout=10)
+                        self._process = None
+                        return f'Scrape timed out after {timeout} seconds'
+
+    def stop(self):
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                self._jobs.put(None)
+                self._process.join(timeout=10)
+            self._process = None
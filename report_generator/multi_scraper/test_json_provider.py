@@ -0,0 +1,54 @@
+"""Check that jsonify and |tojson are serialized by orjson, not stdlib json."""
+import os
+import sys
+import tempfile
+from collections import namedtuple
+from unittest import mock
+
+# Importing app bootstraps its database: keep it out of the real auth_users.db.
+# The OpenAI clients are only constructed at import, never called here.
+_tmp_dir = tempfile.mkdtemp(prefix='test_json_provider_')
+os.environ['AUTH_DB_PATH'] = os.path.join(_tmp_dir, 'auth_users.db')
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ.setdefault('DEFAULT_ADMIN_PASSWORD', 'test')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app import app, jsonify
+
+Row = namedtuple('Row', 'a b')
+
+
+def stdlib_dumps(*args, **kwargs):
+    raise AssertionError('stdlib json.dumps was called')
+
+
+def test_jsonify_uses_orjson():
+    payload = {'b': 1, 'a': [Row(1, 2), 'é'], 3: None}
+    # Any fallback to the stdlib provider would go through json.dumps
+    with mock.patch('json.dumps', stdlib_dumps), app.app_context():
+        response = jsonify(payload)
+    body = response.get_data()
+    print(body)
+    assert body == '{"3":null,"a":[[1,2],"é"],"b":1}\n'.encode(), body
+    assert response.mimetype == 'application/json'
+
+
+def test_tojson_uses_orjson():
+    with mock.patch('json.dumps', stdlib_dumps), app.app_context():
+        rendered = app.jinja_env.from_string('{{ data|tojson }}').render(data={'b': 1, 'a': 2})
+    print(rendered)
+    assert rendered == '{"a":2,"b":1}', rendered
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TEST 1: jsonify response")
+    print("=" * 60)
+    test_jsonify_uses_orjson()
+
+    print("=" * 60)
+    print("TEST 2: |tojson filter")
+    print("=" * 60)
+    test_tojson_uses_orjson()
+
+    print("\nAll JSON provider checks passed")